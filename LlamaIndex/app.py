@@ -1,14 +1,30 @@
+import io
 import os
-import json
+import re
+import math
+import hashlib
 import random
+import json
+import uuid
+import queue
+import asyncio
+import threading
+import urllib.request
+from difflib import SequenceMatcher
+
 import streamlit as st
 
 from pypdf import PdfReader
 
-from llama_index.core import VectorStoreIndex, Document, Settings
+from llama_index.core import VectorStoreIndex, Document
+from llama_index.core.node_parser import SentenceSplitter
 from llama_index.llms.ollama import Ollama
 from llama_index.embeddings.ollama import OllamaEmbedding
 
+from json_stream import JsonObjectStream
+from evidence import match_node, verify_evidence
+from jobs import ACTIVE, JobQueue
+
 
 # -----------------------------
 # Config
@@ -16,22 +32,35 @@ from llama_index.embeddings.ollama import OllamaEmbedding
 APP_TITLE = "📘 PDF 기반 OX 퀴즈 생성기 (LlamaIndex + Qwen2)"
 LLM_MODEL = "qwen2:7b"
 EMBED_MODEL = "nomic-embed-text"  # Ollama embedding 모델(가볍고 많이 씀)
+OLLAMA_URL = "http://localhost:11434"
+OLLAMA_KEEP_ALIVE = "30m"  # 마지막 요청 후 모델을 Ollama 메모리에 유지하는 시간
 CHUNK_SIZE = 1024
 CHUNK_OVERLAP = 128
 
+# Map-Reduce 퀴즈 생성
+MAP_QUESTIONS_PER_CHUNK = 3  # 청크 하나당 요청할 문항 수
+MAP_CONCURRENCY = 4          # Ollama 동시 요청 상한 (서버의 OLLAMA_NUM_PARALLEL 과 맞추면 좋음)
+DEDUP_THRESHOLD = 0.85       # 정규화한 문항끼리 이 비율 이상 비슷하면 중복으로 보고 버림
+MAX_TOPUP_ROUNDS = 1         # 문항이 모자랄 때 부족분만 추가로 요청하는 횟수
+
+# 백그라운드 작업
+INDEX_BATCH_PAGES = 8        # 인덱싱 진행률/취소 확인 단위 (페이지 수)
+JOB_POLL_SECONDS = 1.0       # 화면에서 작업 상태를 다시 읽는 주기
+
 
 # -----------------------------
 # Utils
 # -----------------------------
-def read_pdf_text(pdf_file) -> str:
+def read_pdf_pages(pdf_file) -> list[tuple[int, str]]:
+    # [(페이지 번호(1부터), 텍스트), ...] - 빈 페이지는 제외
     reader = PdfReader(pdf_file)
-    texts = []
-    for page in reader.pages:
+    pages = []
+    for no, page in enumerate(reader.pages, start=1):
         t = page.extract_text() or ""
         t = t.strip()
         if t:
-            texts.append(t)
-    return "\n\n".join(texts)
+            pages.append((no, t))
+    return pages
 
 
 # def build_index_from_text(text: str) -> VectorStoreIndex:
@@ -44,41 +73,88 @@ def read_pdf_text(pdf_file) -> str:
 #     doc = Document(text=text, metadata={"source": "uploaded_pdf"})
 #     index = VectorStoreIndex.from_documents([doc])
 #     return index
-def build_index_from_text(text: str) -> VectorStoreIndex:
-    Settings.llm = Ollama(
+# -----------------------------
+# Shared clients (프로세스 전체에서 1회 생성)
+# -----------------------------
+# 클릭/세션마다 새로 만들지 않고 재사용 → HTTP 커넥션(keep-alive)도 재사용된다.
+# 전역 Settings를 건드리지 않고 필요한 곳에 직접 넘겨서, 여러 세션이 동시에 돌아도 서로 덮어쓰지 않음.
+@st.cache_resource
+def get_llm() -> Ollama:
+    return Ollama(
         model=LLM_MODEL,
         request_timeout=120,
-        base_url="http://localhost:11434"
+        base_url=OLLAMA_URL,
+        keep_alive=OLLAMA_KEEP_ALIVE,
     )
 
-    Settings.embed_model = OllamaEmbedding(
+
+@st.cache_resource
+def get_embed_model() -> OllamaEmbedding:
+    return OllamaEmbedding(
         model_name=EMBED_MODEL,
-        base_url="http://localhost:11434"
+        base_url=OLLAMA_URL,
     )
 
-    Settings.chunk_size = CHUNK_SIZE
-    Settings.chunk_overlap = CHUNK_OVERLAP
-
-    doc = Document(text=text, metadata={"source": "uploaded_pdf"})
-    index = VectorStoreIndex.from_documents([doc])
-    return index
 
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    # 비동기 Ollama 클라이언트가 늘 같은 이벤트 루프에 붙어 있도록 전용 스레드에서 루프 하나를 계속 돌린다
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True, name="ollama-loop").start()
+    return loop
 
 
-def generate_ox_questions(query_engine, n_questions: int = 10) -> list[dict]:
-    """
-    반환 형식:
-    [
-      {"q": "...", "answer": "O" or "X", "explain": "...", "evidence": "..."},
-      ...
+def _ollama_post(path: str, payload: dict, timeout: float = 300) -> None:
+    req = urllib.request.Request(
+        OLLAMA_URL + path,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        resp.read()
+
+
+@st.cache_resource
+def warm_up_models() -> threading.Thread:
+    # 서버 시작 시 1회: qwen2 / nomic-embed-text를 Ollama 메모리에 미리 올려서
+    # 첫 사용자가 모델 로딩 시간을 물지 않게 한다 (화면은 기다리지 않도록 백그라운드로)
+    def _run():
+        try:
+            # prompt 없이 generate를 부르면 모델만 로드한다
+            _ollama_post("/api/generate", {"model": LLM_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE})
+            _ollama_post("/api/embed", {"model": EMBED_MODEL, "input": "warm up",
+                                        "keep_alive": OLLAMA_KEEP_ALIVE})
+        except Exception as e:
+            print(f"⚠️ 모델 warm-up 실패: {e}")
+
+    t = threading.Thread(target=_run, daemon=True, name="ollama-warmup")
+    t.start()
+    return t
+
+
+def build_index_from_pages(pages: list[tuple[int, str]], on_progress=None) -> VectorStoreIndex:
+    # 페이지마다 Document 1개 → 노드 metadata에 page가 남아 근거 위치를 알려줄 수 있다
+    docs = [
+        Document(text=text, metadata={"source": "uploaded_pdf", "page": no})
+        for no, text in pages
     ]
-    """
-    prompt = f"""
+    splitter = SentenceSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    index = VectorStoreIndex(nodes=[], embed_model=get_embed_model())
+
+    # 몇 페이지씩 나눠 넣으면서 진행률을 알린다 (on_progress에서 예외를 던지면 중단)
+    for i in range(0, len(docs), INDEX_BATCH_PAGES):
+        index.insert_nodes(splitter.get_nodes_from_documents(docs[i:i + INDEX_BATCH_PAGES]))
+        if on_progress:
+            on_progress(min(i + INDEX_BATCH_PAGES, len(docs)), len(docs))
+    return index
+
+
+OX_CHUNK_PROMPT = """
 너는 O/X 퀴즈 출제자다.
-주어진 문서 내용만 근거로 O/X 문제 {n_questions}개를 만들어라.
+아래 [문서 발췌] 내용만 근거로 O/X 문제 {n_questions}개를 만들어라.
 - 답은 반드시 "O" 또는 "X"로만.
 - 각 문항은 한 문장으로 명확하게.
-- 각 문항마다 근거가 되는 문장(또는 핵심 구절) 1개를 evidence로 포함.
+- 각 문항마다 근거가 되는 문장(또는 핵심 구절) 1개를 evidence로 포함. (발췌문에서 그대로 인용)
 - 설명(explain)은 1~2문장.
 
 아래 JSON 배열 형식으로만 출력해라. (코드블록 금지)
@@ -86,33 +162,218 @@ def generate_ox_questions(query_engine, n_questions: int = 10) -> list[dict]:
   {{"q":"문제","answer":"O","explain":"해설","evidence":"근거문장"}},
   ...
 ]
+
+[문서 발췌]
+{context}
 """.strip()
 
-    # 문서 기반으로 생성하도록 query_engine에 질의
-    resp = query_engine.query(prompt)
-    raw = str(resp).strip()
 
-    # LLM이 JSON 앞뒤에 텍스트를 붙이는 경우 대비: 가장 바깥 []만 잘라 파싱 시도
-    start = raw.find("[")
-    end = raw.rfind("]")
-    if start != -1 and end != -1 and end > start:
-        raw = raw[start:end + 1]
+def clean_ox_item(item: dict) -> dict | None:
+    """
+    JSON 객체 하나 → 검증된 문항
+    {"q": "...", "answer": "O" or "X", "explain": "...", "evidence": "..."}
+    형식이 맞지 않으면 None
+    """
+    q = str(item.get("q", "")).strip()
+    a = str(item.get("answer", "")).strip().upper()
+    explain = str(item.get("explain", "")).strip()
+    evidence = str(item.get("evidence", "")).strip()
+    if q and a in ("O", "X"):
+        return {"q": q, "answer": a, "explain": explain, "evidence": evidence}
+    return None
+
+
+def sample_diverse_nodes(nodes: list, k: int) -> list:
+    # 문서 전체를 k개 구간으로 나눠 구간마다 청크 1개씩 뽑는다
+    # (top-k 검색처럼 앞부분/비슷한 청크에만 몰리지 않도록)
+    if len(nodes) <= k:
+        return nodes
+
+    bounds = [round(i * len(nodes) / k) for i in range(k + 1)]
+    return [nodes[random.randrange(bounds[i], bounds[i + 1])] for i in range(k)]
+
 
+def _normalize_question(q: str) -> str:
+    return re.sub(r"[\W_]+", "", q).lower()
+
+
+def _is_duplicate(key: str, seen: list[str]) -> bool:
+    return any(
+        key == s or SequenceMatcher(None, key, s).ratio() >= DEDUP_THRESHOLD
+        for s in seen
+    )
+
+
+async def _stream_chunk_items(llm, node, n_questions: int, sem: asyncio.Semaphore,
+                              out: asyncio.Queue, unverified: list[dict]) -> None:
+    # 토큰이 들어오는 대로 파싱해서, 객체 하나가 닫히는 즉시 큐로 보낸다
+    # evidence가 이 청크 원문에 없는 문항은 바로 내보내지 않고 unverified에 모아 둔다
+    prompt = OX_CHUNK_PROMPT.format(n_questions=n_questions, context=node.get_content())
+    parser = JsonObjectStream()
     try:
-        data = json.loads(raw)
-        # 간단 검증
-        cleaned = []
-        for item in data:
-            q = str(item.get("q", "")).strip()
-            a = str(item.get("answer", "")).strip().upper()
-            explain = str(item.get("explain", "")).strip()
-            evidence = str(item.get("evidence", "")).strip()
-            if q and a in ("O", "X"):
-                cleaned.append({"q": q, "answer": a, "explain": explain, "evidence": evidence})
-        return cleaned
+        async with sem:
+            stream = await llm.astream_complete(prompt)
+            async for r in stream:
+                for obj in parser.feed(r.delta or ""):
+                    item = clean_ox_item(obj)
+                    if not item:
+                        continue
+                    # SequenceMatcher 대조는 CPU 작업이라 이벤트 루프(다른 청크 스트림)를 막지 않게 스레드에서
+                    found = await asyncio.to_thread(match_node, item["evidence"], node) if item["evidence"] else None
+                    if found:
+                        await out.put({**item, **found})
+                    else:
+                        unverified.append(item)
+        parser.close()
     except Exception:
+        # 중간에 끊겨도 이미 보낸 문항은 그대로 쓴다
+        pass
+    finally:
+        await out.put(None)  # 이 청크 끝
+
+
+async def agenerate_ox_questions(index: VectorStoreIndex, llm, embed_model, n_questions: int = 10,
+                                 on_question=None) -> list[dict]:
+    """
+    Map-Reduce 방식 OX 퀴즈 생성
+    - Map: 문서 전체에서 고르게 뽑은 청크마다 몇 문항씩 동시에 생성 (동시 요청 수는 MAP_CONCURRENCY로 제한)
+    - Reduce: 문항 객체가 닫히는 순서대로 모으면서 거의 같은 문항은 버리고, n_questions개가 차면 중단
+    - 깨진 문항만 버리고, 모자란 개수만 아직 안 쓴 청크에 다시 요청 (좋은 문항은 재생성하지 않음)
+    - evidence가 원문에서 확인되지 않는 문항(환각)은 내보내지 않음
+      (출제 청크에서 못 찾은 것만 라운드 끝에 인덱스 전체에서 한 번에 재확인)
+    on_question(item)은 문항 하나가 확정될 때마다 호출된다. (UI에 바로 표시용)
+    """
+    all_nodes = list(index.docstore.docs.values())
+    if not all_nodes:
         return []
 
+    sem = asyncio.Semaphore(MAP_CONCURRENCY)
+    results: list[dict] = []
+    seen: list[str] = []
+    used: set[str] = set()
+
+    def accept(item: dict) -> None:
+        key = _normalize_question(item["q"])
+        if len(results) >= n_questions or not key or _is_duplicate(key, seen):
+            return
+        seen.append(key)
+        results.append(item)
+        if on_question:
+            on_question(item)
+
+    for _ in range(MAX_TOPUP_ROUNDS + 1):
+        missing = n_questions - len(results)
+        if missing <= 0:
+            break
+
+        n_chunks = math.ceil(missing / MAP_QUESTIONS_PER_CHUNK)
+        unused = [n for n in all_nodes if n.node_id not in used]
+        nodes = sample_diverse_nodes(unused, n_chunks)
+        if not nodes:
+            break
+        used.update(n.node_id for n in nodes)
+
+        per_chunk = math.ceil(missing / len(nodes))
+        queue: asyncio.Queue = asyncio.Queue()
+        unverified: list[dict] = []
+        tasks = [
+            asyncio.create_task(_stream_chunk_items(llm, node, per_chunk, sem, queue, unverified))
+            for node in nodes
+        ]
+
+        pending = len(tasks)
+        try:
+            while pending and len(results) < n_questions:
+                item = await queue.get()
+                if item is None:
+                    pending -= 1
+                    continue
+                accept(item)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # 청크 경계(overlap)에 걸친 근거일 수 있으니, 남은 것만 인덱스 전체와 한 번에 대조
+        if unverified and len(results) < n_questions:
+            verified, _ = await asyncio.to_thread(verify_evidence, index, embed_model, unverified)
+            for item in verified:
+                accept(item)
+
+    return results
+
+
+def generate_ox_questions(index: VectorStoreIndex, n_questions: int = 10, on_question=None,
+                          should_stop=None) -> list[dict]:
+    # 생성은 공용 이벤트 루프에서 돌리고, 완성된 문항은 큐로 받아 호출한 스레드에서 on_question 호출
+    done_items: queue.Queue = queue.Queue()
+    fut = asyncio.run_coroutine_threadsafe(
+        agenerate_ox_questions(index, get_llm(), get_embed_model(), n_questions,
+                               on_question=done_items.put),
+        get_event_loop(),
+    )
+
+    try:
+        while True:
+            if should_stop and should_stop():
+                return []
+            try:
+                item = done_items.get(timeout=0.1)
+            except queue.Empty:
+                if fut.done():
+                    break
+                continue
+            if on_question:
+                on_question(item)
+
+        while not done_items.empty():
+            item = done_items.get_nowait()
+            if on_question:
+                on_question(item)
+
+        return fut.result()
+    finally:
+        # 취소/예외로 빠져나가면 Ollama 요청도 같이 끊는다
+        if not fut.done():
+            fut.cancel()
+
+
+# -----------------------------
+# Background jobs
+# -----------------------------
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    return JobQueue()
+
+
+def run_index_job(ctx, pdf_bytes: bytes) -> VectorStoreIndex:
+    ctx.progress(0.0, "PDF 텍스트 추출 중...")
+    pages = read_pdf_pages(io.BytesIO(pdf_bytes))
+    if not pages:
+        raise ValueError("PDF에서 텍스트를 추출하지 못했습니다. (스캔 PDF면 OCR이 필요할 수 있어요)")
+
+    def on_progress(done: int, total: int):
+        ctx.progress(done / total, f"LlamaIndex 인덱스 생성 중... ({done}/{total} 페이지)")
+
+    return build_index_from_pages(pages, on_progress=on_progress)
+
+
+def run_quiz_job(ctx, index: VectorStoreIndex, n_questions: int) -> list[dict]:
+    items: list[dict] = []
+
+    def on_question(item: dict):
+        # 중간 결과도 DB에 남겨서 화면에 바로 보이게
+        items.append(item)
+        ctx.progress(len(items) / n_questions,
+                     f"문서 기반 OX 퀴즈 생성 중... ({len(items)}/{n_questions})", partial=items)
+
+    ctx.progress(0.0, "문서 기반 OX 퀴즈 생성 중...")
+    qs = generate_ox_questions(index, n_questions, on_question=on_question, should_stop=ctx.cancelled)
+    ctx.check()
+    if not qs:
+        raise ValueError("퀴즈 생성에 실패했어요. (모델 출력이 JSON이 아니거나 근거 부족)")
+    return qs
+
 
 # -----------------------------
 # UI
@@ -120,16 +381,29 @@ def generate_ox_questions(query_engine, n_questions: int = 10) -> list[dict]:
 st.set_page_config(page_title=APP_TITLE, layout="wide")
 st.title(APP_TITLE)
 
+warm_up_models()
+
 with st.sidebar:
     st.subheader("⚙️ 설정")
     num_q = st.slider("문항 수", 5, 30, 10, 1)
     shuffle_q = st.checkbox("문항 섞기", value=True)
-    st.caption("LLM: qwen2:7b (Ollama), Embedding: nomic-embed-text")
+    st.caption(f"LLM: {LLM_MODEL} (Ollama), Embedding: {EMBED_MODEL}")
 
 uploaded = st.file_uploader("PDF 업로드", type=["pdf"])
 
+jobs = get_job_queue()
+
+if "session_id" not in st.session_state:
+    # 작업 큐에서 이 세션을 구분하는 값 (다른 세션과 공유한 작업을 혼자 취소하지 않도록)
+    st.session_state.session_id = uuid.uuid4().hex
 if "index" not in st.session_state:
     st.session_state.index = None
+if "index_key" not in st.session_state:
+    st.session_state.index_key = None
+if "index_job" not in st.session_state:
+    st.session_state.index_job = None
+if "quiz_job" not in st.session_state:
+    st.session_state.quiz_job = None
 if "questions" not in st.session_state:
     st.session_state.questions = []
 if "score" not in st.session_state:
@@ -138,39 +412,85 @@ if "submitted" not in st.session_state:
     st.session_state.submitted = False
 
 
+def on_index_done(job_id: str):
+    index = jobs.result(job_id)
+    if index is None:
+        st.error("인덱스 결과가 만료되었습니다. 다시 생성해주세요.")
+        return
+    st.session_state.index = index
+
+
+def on_quiz_done(job_id: str):
+    qs = list(jobs.result(job_id) or jobs.get(job_id)["partial"] or [])
+    if shuffle_q:
+        random.shuffle(qs)
+    st.session_state.questions = qs
+    st.session_state.submitted = False
+    st.session_state.score = 0
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_status(state_key: str, on_done):
+    # 작업은 백그라운드에서 돌고, 화면은 이 조각만 주기적으로 다시 그려 상태를 읽어온다
+    job_id = st.session_state[state_key]
+    if not job_id:
+        return
+    job = jobs.get(job_id)
+    if job is None:
+        return
+
+    if job["status"] in ACTIVE:
+        st.progress(job["progress"], text=job["message"] or "대기 중...")
+        if st.button("⏹ 취소", key=f"cancel_{state_key}"):
+            if not jobs.cancel(job_id, owner=st.session_state.session_id):
+                # 다른 세션도 기다리는 작업이면 이 세션만 빠짐
+                st.session_state[state_key] = None
+                st.rerun()
+        for item in job["partial"] or []:
+            # 완성된 문항부터 바로 보여주기
+            st.markdown(f"- {item['q']}")
+    elif job["status"] == "done":
+        st.session_state[state_key] = None
+        on_done(job_id)
+        st.rerun()
+    elif job["status"] == "cancelled":
+        st.warning("작업이 취소되었습니다.")
+    else:
+        st.error(job["message"] or "작업이 실패했습니다.")
+
+
 if uploaded:
     col1, col2 = st.columns([1, 1])
 
     with col1:
         st.subheader("1) PDF 읽기 / 인덱싱")
         if st.button("📌 인덱스 생성", type="primary"):
-            with st.spinner("PDF 텍스트 추출 중..."):
-                text = read_pdf_text(uploaded)
-
-            if not text.strip():
-                st.error("PDF에서 텍스트를 추출하지 못했습니다. (스캔 PDF면 OCR이 필요할 수 있어요)")
-            else:
-                with st.spinner("LlamaIndex 인덱스 생성 중..."):
-                    st.session_state.index = build_index_from_text(text)
-                st.success("인덱스 생성 완료!")
+            pdf_bytes = uploaded.getvalue()
+            key = hashlib.sha256(pdf_bytes).hexdigest()
+            st.session_state.index = None
+            st.session_state.index_key = key
+            # 같은 PDF는 진행 중/완료된 작업을 그대로 재사용
+            st.session_state.index_job = jobs.submit(
+                "index", key, run_index_job, pdf_bytes,
+                owner=st.session_state.session_id, reuse_done=True,
+            )
+        job_status("index_job", on_index_done)
+        if st.session_state.index is not None:
+            st.success("인덱스 생성 완료!")
 
     with col2:
         st.subheader("2) OX 퀴즈 생성")
         can_make = st.session_state.index is not None
         if st.button("🧠 퀴즈 생성", disabled=not can_make):
-            with st.spinner("문서 기반 OX 퀴즈 생성 중..."):
-                qe = st.session_state.index.as_query_engine(similarity_top_k=4)
-                qs = generate_ox_questions(qe, n_questions=num_q)
-
-            if not qs:
-                st.error("퀴즈 생성에 실패했어요. (모델 출력이 JSON이 아니거나 근거 부족)")
-            else:
-                if shuffle_q:
-                    random.shuffle(qs)
-                st.session_state.questions = qs
-                st.session_state.submitted = False
-                st.session_state.score = 0
-                st.success(f"퀴즈 {len(qs)}개 생성 완료!")
+            # 같은 문서/문항 수로 이미 생성 중이면 그 작업에 붙는다
+            st.session_state.quiz_job = jobs.submit(
+                "quiz", f"{st.session_state.index_key}:{num_q}",
+                run_quiz_job, st.session_state.index, num_q,
+                owner=st.session_state.session_id,
+            )
+        job_status("quiz_job", on_quiz_done)
+        if st.session_state.questions and not st.session_state.quiz_job:
+            st.success(f"퀴즈 {len(st.session_state.questions)}개 생성 완료!")
 
 st.divider()
 
@@ -217,6 +537,7 @@ if st.session_state.questions:
                 if item.get("explain"):
                     st.markdown(f"- **해설:** {item['explain']}")
                 if item.get("evidence"):
-                    st.markdown(f"- **근거:** {item['evidence']}")
+                    where = f" (p.{item['page']})" if item.get("page") else ""
+                    st.markdown(f"- **근거{where}:** {item['evidence']}")
 else:
     st.info("PDF를 업로드하고 인덱스를 만든 뒤 퀴즈를 생성해보세요.")
@@ -0,0 +1,97 @@
+import re
+from difflib import SequenceMatcher
+
+import numpy as np
+
+
+# =====================================================
+# 퀴즈 근거(evidence) 검증
+# -----------------------------------------------------
+# LLM에게 다시 묻지 않고, 이미 만들어 둔 인덱스로만 확인한다.
+# 1) evidence 문장들을 한 번에 임베딩 → 전체 노드 임베딩과 행렬곱으로 후보 노드 top-k
+# 2) 후보 노드 원문에 evidence가 (거의) 그대로 들어 있는지 fuzzy substring 매칭
+# =====================================================
+EVIDENCE_MIN_RATIO = 0.8  # 부분 문자열 유사도가 이 이상이면 근거 확인
+EVIDENCE_TOP_K = 3        # 임베딩으로 고른 후보 노드 수
+
+
+def normalize_text(s: str) -> str:
+    # PDF 추출 텍스트는 줄바꿈/띄어쓰기가 제멋대로라 공백을 아예 없애고 비교
+    return re.sub(r"\s+", "", s).lower()
+
+
+def partial_ratio(needle: str, haystack: str) -> float:
+    # haystack 안에서 needle과 가장 비슷한 같은 길이 구간의 유사도 (0~1)
+    if not needle or not haystack:
+        return 0.0
+    if needle in haystack:
+        return 1.0
+    if len(needle) >= len(haystack):
+        return SequenceMatcher(None, needle, haystack, autojunk=False).ratio()
+
+    best = 0.0
+    blocks = SequenceMatcher(None, needle, haystack, autojunk=False).get_matching_blocks()
+    for a, b, size in blocks:
+        if not size:
+            continue
+        start = max(0, b - a)
+        window = haystack[start:start + len(needle)]
+        best = max(best, SequenceMatcher(None, needle, window, autojunk=False).ratio())
+        if best == 1.0:
+            break
+    return best
+
+
+def match_node(evidence: str, node) -> dict | None:
+    """evidence가 이 노드 원문에 있으면 {node_id, page, evidence_score}"""
+    score = partial_ratio(normalize_text(evidence), normalize_text(node.get_content()))
+    if score < EVIDENCE_MIN_RATIO:
+        return None
+    return {
+        "node_id": node.node_id,
+        "page": node.metadata.get("page"),
+        "evidence_score": round(score, 3),
+    }
+
+
+def verify_evidence(index, embed_model, items: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    items의 evidence를 인덱스 원문과 대조
+    반환: (확인된 문항들 - node_id/page/evidence_score 추가, 근거를 못 찾은 문항들)
+    """
+    checkable = [it for it in items if it.get("evidence")]
+    rejected = [it for it in items if not it.get("evidence")]
+    if not checkable:
+        return [], rejected
+
+    embedding_dict = index.vector_store.data.embedding_dict
+    node_ids = list(embedding_dict.keys())
+    if not node_ids:
+        return [], items
+
+    # 노드 임베딩 / evidence 임베딩 (evidence는 배치 1회 요청)
+    node_mat = np.asarray([embedding_dict[i] for i in node_ids], dtype=np.float32)
+    ev_mat = np.asarray(
+        embed_model.get_text_embedding_batch([it["evidence"] for it in checkable]),
+        dtype=np.float32,
+    )
+    node_mat /= np.linalg.norm(node_mat, axis=1, keepdims=True) + 1e-8
+    ev_mat /= np.linalg.norm(ev_mat, axis=1, keepdims=True) + 1e-8
+
+    sims = ev_mat @ node_mat.T  # (evidence 수, 노드 수)
+    k = min(EVIDENCE_TOP_K, len(node_ids))
+    top = np.argsort(-sims, axis=1)[:, :k]
+
+    verified = []
+    for item, cand in zip(checkable, top):
+        found = None
+        for j in cand:
+            node = index.docstore.get_node(node_ids[j])
+            found = match_node(item["evidence"], node)
+            if found:
+                break
+        if found:
+            verified.append({**item, **found})
+        else:
+            rejected.append(item)
+    return verified, rejected
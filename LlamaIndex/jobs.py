@@ -0,0 +1,191 @@
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# =====================================================
+# 로컬 백그라운드 작업 큐
+# -----------------------------------------------------
+# - Streamlit 스크립트가 rerun 되어도 작업은 워커 스레드에서 계속 돈다
+# - 작업 상태/진행률은 SQLite(jobs 테이블)에 기록 → 화면은 주기적으로 읽기만 함
+# - 같은 (kind, key) 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 작업 id를 돌려줌
+#   (작업을 같이 쓰는 세션을 owner 로 기록 → 마지막 owner 가 취소할 때만 실제로 멈춤)
+# - 결과 객체(인덱스 등)는 메모리에, JSON으로 바꿀 수 있는 결과/중간 결과는 DB에도 저장
+# =====================================================
+JOB_DB_PATH = "jobs.db"
+MAX_WORKERS = 2
+MAX_RESULTS = 20  # 메모리에 들고 있을 결과 수 (오래된 것부터 버림)
+
+ACTIVE = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """작업 함수에 첫 번째 인자로 넘어가는 핸들"""
+
+    def __init__(self, jobs: "JobQueue", job_id: str, cancel_flag: threading.Event):
+        self._jobs = jobs
+        self.job_id = job_id
+        self._cancel_flag = cancel_flag
+
+    def cancelled(self) -> bool:
+        return self._cancel_flag.is_set()
+
+    def check(self) -> None:
+        # 긴 작업 중간중간 불러서 취소 요청이 있으면 바로 멈춘다
+        if self.cancelled():
+            raise JobCancelled()
+
+    def progress(self, value: float, message: str = "", partial=None) -> None:
+        self._jobs._update(
+            self.job_id,
+            progress=max(0.0, min(1.0, value)),
+            message=message,
+            result_json=json.dumps(partial, ensure_ascii=False) if partial is not None else None,
+        )
+        self.check()
+
+
+class JobQueue:
+    def __init__(self, db_path: str = JOB_DB_PATH, max_workers: int = MAX_WORKERS):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._cancel_flags: dict[str, threading.Event] = {}   # 대기/실행 중인 작업만
+        self._owners: dict[str, set[str]] = {}                # 작업 id → 그 작업을 기다리는 세션들
+        self._results: OrderedDict[str, object] = OrderedDict()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT NOT NULL DEFAULT '',
+                    result_json TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_kind_key ON jobs(kind, key)")
+            # 프로세스가 죽으면서 남은 작업은 다시 돌지 않으므로 실패로 정리
+            conn.execute(
+                "UPDATE jobs SET status='failed', message='서버 재시작으로 중단됨', updated_at=? "
+                "WHERE status IN ('queued', 'running')",
+                (time.time(),),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields = {k: v for k, v in fields.items() if v is not None}
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{k}=?" for k in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {cols} WHERE id=?", (*fields.values(), job_id))
+
+    # -----------------------------
+    # 작업 등록 / 조회 / 취소
+    # -----------------------------
+    def submit(self, kind: str, key: str, fn, *args, owner: str = "", reuse_done: bool = False) -> str:
+        """
+        fn(ctx, *args)를 백그라운드에서 실행하고 job id 반환
+        owner: 작업을 요청한 세션 id (같은 작업을 여러 세션이 공유할 때 취소 판단용)
+        reuse_done=True면 같은 (kind, key)로 끝난 작업의 결과가 남아 있을 때 그것을 재사용
+        """
+        with self._lock:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT id, status FROM jobs WHERE kind=? AND key=? ORDER BY created_at DESC",
+                    (kind, key),
+                ).fetchall()
+                for job_id, status in rows:
+                    if status in ACTIVE and job_id in self._cancel_flags:
+                        self._owners[job_id].add(owner)
+                        return job_id
+                    if reuse_done and status == "done" and job_id in self._results:
+                        return job_id
+
+                job_id = uuid.uuid4().hex
+                now = time.time()
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, key, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?)",
+                    (job_id, kind, key, now, now),
+                )
+            flag = self._cancel_flags[job_id] = threading.Event()
+            self._owners[job_id] = {owner}
+
+        self._pool.submit(self._run, job_id, flag, fn, args)
+        return job_id
+
+    def _run(self, job_id: str, flag: threading.Event, fn, args) -> None:
+        try:
+            self._execute(JobContext(self, job_id, flag), fn, args)
+        finally:
+            # 끝난 작업은 더 취소할 일이 없으므로 정리 (안 하면 작업 수만큼 계속 쌓임)
+            with self._lock:
+                self._cancel_flags.pop(job_id, None)
+                self._owners.pop(job_id, None)
+
+    def _execute(self, ctx: JobContext, fn, args) -> None:
+        job_id = ctx.job_id
+        if ctx.cancelled():
+            self._update(job_id, status="cancelled", message="취소됨")
+            return
+
+        self._update(job_id, status="running")
+        try:
+            result = fn(ctx, *args)
+        except JobCancelled:
+            self._update(job_id, status="cancelled", message="취소됨")
+            return
+        except Exception as e:
+            self._update(job_id, status="failed", message=str(e))
+            return
+
+        with self._lock:
+            self._results[job_id] = result
+            while len(self._results) > MAX_RESULTS:
+                self._results.popitem(last=False)
+
+        try:
+            result_json = json.dumps(result, ensure_ascii=False)
+        except TypeError:
+            result_json = None  # 인덱스 같은 객체는 메모리에만
+        self._update(job_id, status="done", progress=1.0, message="완료", result_json=result_json)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["partial"] = json.loads(job.pop("result_json")) if row["result_json"] else None
+        return job
+
+    def result(self, job_id: str):
+        return self._results.get(job_id)
+
+    def cancel(self, job_id: str, owner: str = "") -> bool:
+        """owner 를 작업에서 빼고, 더 기다리는 세션이 없으면 실제로 취소. 멈췄으면 True"""
+        with self._lock:
+            owners = self._owners.get(job_id)
+            if owners is None:
+                return False
+            owners.discard(owner)
+            if owners:
+                return False
+            self._cancel_flags[job_id].set()
+            return True
@@ -0,0 +1,89 @@
+import json
+
+
+# =====================================================
+# 스트리밍 JSON 배열 파서
+# -----------------------------------------------------
+# LLM이 토큰 단위로 흘려보내는 "[ {...}, {...}, ... ]" 출력에서
+# 최상위 {...} 객체가 닫히는 즉시 하나씩 꺼낸다.
+# - 배열 앞뒤 잡담/코드블록(```json)은 무시
+# - 깨진 객체 하나만 건너뛰고 나머지는 그대로 살린다
+# =====================================================
+class JsonObjectStream:
+    def __init__(self, flat: bool = True):
+        # flat=True: 객체 안에 객체가 없는 형식(퀴즈 문항 등)
+        #   → 객체 안에서 새 "{"가 보이면 앞 객체가 안 닫힌 것으로 보고 버린다
+        self.flat = flat
+        self.skipped = 0
+        self._reset()
+
+    def _reset(self):
+        self._buf: list[str] = []
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+
+    def _drop(self):
+        self.skipped += 1
+        self._reset()
+
+    def _start(self):
+        self._reset()
+        self._buf = ["{"]
+        self._depth = 1
+
+    def feed(self, chunk: str) -> list[dict]:
+        """토큰 조각을 넣고, 이번에 완성된 객체들을 반환"""
+        done = []
+        for ch in chunk:
+            if self._depth == 0:
+                if ch == "{":
+                    self._start()
+                continue
+
+            if self._in_str:
+                if ch == "\n":
+                    # JSON 문자열 안에는 줄바꿈이 올 수 없음 → 따옴표가 안 닫힌 항목
+                    self._drop()
+                    continue
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+
+            if ch == "{" and self.flat:
+                # 앞 객체가 닫히지 않은 채 다음 객체가 시작됨
+                self._drop()
+                self._start()
+                continue
+
+            self._buf.append(ch)
+            if ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = "".join(self._buf)
+                    self._reset()
+                    try:
+                        obj = json.loads(raw)
+                    except json.JSONDecodeError:
+                        self.skipped += 1
+                        continue
+                    if isinstance(obj, dict):
+                        done.append(obj)
+                    else:
+                        self.skipped += 1
+        return done
+
+    def close(self) -> None:
+        """스트림 종료: 끝까지 닫히지 않은 객체는 버린다"""
+        if self._depth > 0:
+            self._drop()
+
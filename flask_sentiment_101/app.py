@@ -1,18 +1,20 @@
-from flask import Flask, render_template, request
-from transformers import pipeline
+import json
+import time
+
+from flask import Flask, Response, jsonify, render_template, request
+
+from sentiment_batch import BATCH_SIZE, cache, check_batch_size, classify_stream, classify_texts, iter_records
+
+# 배치 API 한 요청에서 받을 수 있는 최대 문장 수
+MAX_BATCH_TEXTS = 100_000
 
 app = Flask(__name__)
 
 # Sentiment analysis pipeline (English default)
 # clf = pipeline("sentiment-analysis")
 
-clf = pipeline(
-    "text-classification",  # sentiment-analysis 대신 text-classification (이 모델은 이렇게)
-    model="tabularisai/multilingual-sentiment-analysis",
-    return_all_scores=False  # True로 하면 모든 점수 나옴
-)
-
-
+# 모델(tabularisai/multilingual-sentiment-analysis)은 sentiment_batch 에서 레지스트리에 등록되고
+# 첫 요청 때 로드된다 (같은 프로세스의 다른 앱과 공유)
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -23,7 +25,8 @@ def index():
     if request.method == "POST":
         text = request.form.get("text", "").strip()
         if text:
-            pred = clf(text)[0]
+            # 같은 문장은 캐시에서 바로
+            pred = classify_texts([text])[0]
             result = {
                 "label": pred["label"],
                 "score": round(float(pred["score"]) * 100, 2)
@@ -31,5 +34,68 @@ def index():
 
     return render_template("index.html", text=text, result=result)
 
+
+@app.route("/api/sentiment/batch", methods=["POST"])
+def sentiment_batch():
+    """
+    입력: JSON {"texts": [...]} / JSON 배열 / NDJSON(한 줄에 {"text": ...} 또는 문장)
+    출력: NDJSON - 입력 순서대로 {"i", "label", "score"} 한 줄씩, 마지막 줄은 {"summary": {...}}
+    """
+    batch_size = request.args.get("batch_size", BATCH_SIZE, type=int)
+    # 스트림이 시작된 뒤에는 상태 코드를 바꿀 수 없으므로 미리 검사
+    try:
+        check_batch_size(batch_size)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.is_json:
+        body = request.get_json(silent=True)
+        texts = body.get("texts") if isinstance(body, dict) else body
+        if not isinstance(texts, list):
+            return jsonify({"error": "texts 리스트가 필요합니다."}), 400
+        texts = [str(t) for t in texts]
+    else:
+        lines = request.get_data(as_text=True).splitlines()
+        texts = [str(r.get("text", "")) for r in iter_records(lines)]
+
+    if len(texts) > MAX_BATCH_TEXTS:
+        return jsonify({"error": f"한 번에 최대 {MAX_BATCH_TEXTS}개까지 가능합니다."}), 413
+
+    def generate():
+        start = time.perf_counter()
+        for i, pred in enumerate(classify_stream(texts, batch_size)):
+            yield json.dumps({"i": i, **pred}, ensure_ascii=False) + "\n"
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "count": len(texts),
+            "seconds": round(elapsed, 3),
+            "texts_per_sec": round(len(texts) / elapsed, 1) if elapsed else None,
+        }
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@app.route("/metrics")
+def metrics():
+    # Prometheus 텍스트 형식
+    s = cache.stats()
+    lines = [
+        "# TYPE sentiment_cache_lookups_total counter",
+        f"sentiment_cache_lookups_total {s['lookups']}",
+        "# TYPE sentiment_cache_hits_total counter",
+        f"sentiment_cache_hits_total {s['cache_hits']}",
+        "# TYPE sentiment_cache_dedup_hits_total counter",
+        f"sentiment_cache_dedup_hits_total {s['dedup_hits']}",
+        "# TYPE sentiment_model_runs_total counter",
+        f"sentiment_model_runs_total {s['model_runs']}",
+        "# TYPE sentiment_cache_hit_rate gauge",
+        f"sentiment_cache_hit_rate {s['hit_rate']}",
+        "# TYPE sentiment_cache_entries gauge",
+        f"sentiment_cache_entries {s['entries']}",
+    ]
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001, debug=True)
@@ -1,15 +1,28 @@
 from flask import Flask, render_template, request
 from transformers import pipeline
 
+from inference_backend import DEFAULT_BACKEND, load_seq2seq
+from model_registry import registry
+
+SUMMARY_MODEL = "digit82/kobart-summarization"
+
 app = Flask(__name__)
 
+
 # 요약 모델 (한국어)
-summarizer = pipeline(
-    "summarization",
-    model="digit82/kobart-summarization",
-    tokenizer="digit82/kobart-summarization",
-    device=0  # GPU 없으면 -1
-)
+# 추론 백엔드: eager / int8 / compile / onnx (환경변수 SUMMARY_BACKEND)
+# 모델은 백엔드가 정한 장치(GPU 없으면 CPU)에 이미 올라가 있으므로 device는 따로 주지 않는다
+def load_summarizer():
+    tokenizer, model = load_seq2seq(SUMMARY_MODEL, DEFAULT_BACKEND)
+    return pipeline(
+        "summarization",
+        model=model,
+        tokenizer=tokenizer
+    )
+
+
+# 첫 요청 때 로드
+registry.register(f"{SUMMARY_MODEL}:pipeline", load_summarizer)
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -20,6 +33,7 @@ def index():
         input_text = request.form.get("text", "")
 
         if input_text.strip():
+            summarizer = registry.get(f"{SUMMARY_MODEL}:pipeline")
             result = summarizer(
                 input_text,
                 max_length=128,
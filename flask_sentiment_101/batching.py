@@ -0,0 +1,120 @@
+import time
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+
+
+# =====================================================
+# 동적 배치 워커 (model serving)
+# -----------------------------------------------------
+# 여러 요청 스레드가 submit()으로 넣은 항목을 key(= 같은 generate 파라미터)별로 모아서
+# 한 key 가 max_batch개 차거나 그 key 의 첫 항목이 max_wait_ms 를 기다리면 batch_fn 한 번으로 처리하고,
+# 각 결과를 기다리던 요청의 Future로 돌려준다.
+# (key 를 나누기 전에 개수를 세면 key 가 섞일 때 배치가 max_batch 보다 훨씬 작아짐)
+# 모델은 이 워커 스레드 하나만 만지므로 요청끼리 모델을 두고 다투지 않는다.
+# 배치로 묶을 수 없는 작업(토큰 스트리밍, assisted generation)도 call() 로 이 스레드에서 한 건씩 돌린다.
+# (flask_sentiment_101, flask_summarization 에 같은 파일이 있음, 고칠 때 같이)
+# =====================================================
+_CALL = object()  # call() 로 들어온 단발 작업의 key
+
+
+class _Request:
+    __slots__ = ("item", "key", "future", "arrived")
+
+    def __init__(self, item, key):
+        self.item = item
+        self.key = key
+        self.future = Future()
+        self.arrived = time.monotonic()
+
+
+class BatchingWorker:
+    def __init__(self, batch_fn, max_batch: int = 8, max_wait_ms: float = 10, name: str = "batcher"):
+        """batch_fn(items: list, key) -> items와 같은 순서/개수의 결과 list"""
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._pending: dict = defaultdict(list)   # key -> 아직 처리 안 한 요청 (워커 스레드만 만짐)
+        self._thread = threading.Thread(target=self._loop, daemon=True, name=name)
+        self._thread.start()
+
+    def submit(self, item, key=None) -> Future:
+        req = _Request(item, key)
+        self._queue.put(req)
+        return req.future
+
+    def call(self, fn) -> Future:
+        # fn() 을 배치 사이에 워커 스레드에서 실행 (모델을 직접 만지는 단발 작업용)
+        return self.submit(fn, key=_CALL)
+
+    def run(self, items: list, key=None) -> list:
+        # 여러 항목을 넣고 결과가 다 나올 때까지 기다림 (요청 스레드에서 호출)
+        futures = [self.submit(item, key) for item in items]
+        return [f.result() for f in futures]
+
+    def _add(self, req: _Request) -> None:
+        self._pending[req.key].append(req)
+
+    def _ready(self) -> list:
+        # 꽉 찬 key, 또는 첫 항목이 max_wait 를 넘긴 key → 처리할 (key, 요청들) 목록
+        now = time.monotonic()
+        ready = []
+        for key, reqs in list(self._pending.items()):
+            if key is _CALL:
+                # 단발 작업은 기다리지 않고 한 건씩
+                ready.extend((key, [r]) for r in reqs)
+                del self._pending[key]
+            elif len(reqs) >= self.max_batch or now - reqs[0].arrived >= self.max_wait:
+                ready.append((key, reqs[:self.max_batch]))
+                rest = reqs[self.max_batch:]
+                if rest:
+                    self._pending[key] = rest
+                else:
+                    del self._pending[key]
+        return ready
+
+    def _collect(self) -> list:
+        if not self._pending:
+            self._add(self._queue.get())
+        while True:
+            # 대기 시간이 끝났어도 이미 들어와 있는 것은 key 별로 먼저 나눠 담음
+            try:
+                while True:
+                    self._add(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            ready = self._ready()
+            if ready:
+                return ready
+            oldest = min(reqs[0].arrived for reqs in self._pending.values())
+            try:
+                self._add(self._queue.get(timeout=max(0.0, oldest + self.max_wait - time.monotonic())))
+            except queue.Empty:
+                pass
+
+    def _loop(self) -> None:
+        while True:
+            for key, reqs in self._collect():
+                self._run(key, reqs)
+
+    def _run(self, key, reqs: list[_Request]) -> None:
+        if key is _CALL:
+            for r in reqs:
+                try:
+                    r.future.set_result(r.item())
+                except Exception as e:
+                    r.future.set_exception(e)
+            return
+
+        try:
+            results = self.batch_fn([r.item for r in reqs], key)
+        except Exception as e:
+            for r in reqs:
+                r.future.set_exception(e)
+            return
+
+        for r, result in zip(reqs, results):
+            r.future.set_result(result)
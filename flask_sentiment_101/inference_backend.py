@@ -0,0 +1,73 @@
+import os
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+
+# =====================================================
+# Seq2Seq 요약 모델 추론 백엔드 (CPU 최적화 선택)
+# -----------------------------------------------------
+# eager   : 기본 fp32 PyTorch
+# int8    : 동적 int8 양자화 (nn.Linear 가중치만 int8, CPU 전용)
+# compile : torch.compile 로 forward 컴파일 (generate 루프는 그대로)
+# onnx    : ONNX Runtime (optimum) - 인코더는 1번만, 디코더는 past key/value 캐시 사용
+#           첫 실행 때 내보낸 ONNX 모델을 ONNX_CACHE_DIR 에 저장해 두고 재사용
+#
+# 환경변수 SUMMARY_BACKEND 로 선택 (기본 eager)
+# (flask_sentiment_101, flask_summarization, pyQt_summarization 에 같은 파일이 있음, 고칠 때 같이)
+# =====================================================
+BACKENDS = ("eager", "int8", "compile", "onnx")
+DEFAULT_BACKEND = os.environ.get("SUMMARY_BACKEND", "eager")
+ONNX_CACHE_DIR = os.environ.get("SUMMARY_ONNX_DIR", "onnx_models")
+
+
+def pick_device(backend: str = DEFAULT_BACKEND) -> str:
+    # int8 양자화 / ONNX Runtime(CPU EP)은 CPU에서만 돈다
+    if backend in ("int8", "onnx"):
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _load_onnx(model_name: str):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError(
+            "onnx 백엔드는 optimum[onnxruntime] 설치가 필요합니다: pip install optimum[onnxruntime]"
+        ) from e
+
+    export_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+    if os.path.isdir(export_dir):
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+def load_seq2seq(model_name: str, backend: str = DEFAULT_BACKEND, device: str | None = None):
+    """(tokenizer, model) 반환 - model은 어느 백엔드든 .generate() 로 동일하게 사용"""
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드: {backend} (가능: {', '.join(BACKENDS)})")
+
+    device = device or pick_device(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend == "onnx":
+        return tokenizer, _load_onnx(model_name)
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model.eval()
+
+    if backend == "int8":
+        if device != "cpu":
+            raise ValueError("int8 동적 양자화는 CPU 에서만 사용할 수 있습니다.")
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    model.to(device)
+
+    if backend == "compile":
+        # 입력/출력 길이가 매번 달라서 dynamic=True (길이마다 재컴파일 방지)
+        model.forward = torch.compile(model.forward, dynamic=True)
+
+    return tokenizer, model
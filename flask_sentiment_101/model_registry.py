@@ -0,0 +1,122 @@
+import os
+import threading
+from collections import OrderedDict
+
+import torch
+
+
+# =====================================================
+# 공용 모델 레지스트리
+# -----------------------------------------------------
+# - import 시점에는 아무것도 로드하지 않고, 처음 get() 할 때 로드 (앱 시작이 빠름)
+# - 같은 프로세스 안의 앱들은 같은 이름의 모델을 하나만 들고 공유
+#   (공유 범위는 프로세스 하나: flask_sentiment_101/serve_all.py 로 묶어 띄운 앱들끼리만.
+#    따로 실행하는 flask_summarization/app.py 는 자기 프로세스에 자기 레지스트리를 가짐)
+# - 올라간 모델 크기 합이 MODEL_RAM_BUDGET_MB 를 넘으면 가장 오래 안 쓴 모델부터 내림
+#   (쓰는 중인 요청이 참조를 들고 있으면 그 요청이 끝난 뒤에 메모리가 풀림)
+#
+# 폴더마다 따로 실행하는 예제라 flask_sentiment_101 / flask_summarization 에 같은 파일을 둔다
+# (batching.py, uploads.py, inference_backend.py 도 마찬가지) → 고치면 다른 폴더의 복사본도 같이
+# =====================================================
+MODEL_RAM_BUDGET_MB = int(os.environ.get("MODEL_RAM_BUDGET_MB", 4096))
+
+
+def auto_device() -> str:
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def pipeline_device(device: str | None = None) -> int | str:
+    # transformers pipeline 의 device 인자 (GPU 0번 / CPU -1 / mps)
+    device = device or auto_device()
+    if device == "cuda":
+        return 0
+    if device == "cpu":
+        return -1
+    return device
+
+
+def model_nbytes(obj) -> int:
+    # 파라미터 + 버퍼 크기 (pipeline, (tokenizer, model) 튜플, generate 인자 dict 도 처리)
+    if isinstance(obj, (tuple, list)):
+        return sum(model_nbytes(o) for o in obj)
+    if isinstance(obj, dict):
+        return sum(model_nbytes(o) for o in obj.values())
+    module = getattr(obj, "model", obj)
+    if isinstance(module, torch.nn.Module):
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    return 0  # 크기를 알 수 없는 객체(토크나이저, ONNX 세션 등)
+
+
+class ModelRegistry:
+    def __init__(self, budget_mb: int = MODEL_RAM_BUDGET_MB):
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self._loaders: dict = {}
+        self._loaded: OrderedDict = OrderedDict()  # name -> (obj, nbytes), 최근 사용이 뒤쪽
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader) -> None:
+        """loader() -> 모델 객체. 이미 같은 이름이 있으면 먼저 등록된 것을 그대로 씀 (앱 간 공유)"""
+        with self._lock:
+            self._loaders.setdefault(name, loader)
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str):
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return self._loaded[name][0]
+            if name not in self._loaders:
+                raise KeyError(f"등록되지 않은 모델: {name}")
+            load_lock = self._load_locks[name]
+
+        # 같은 모델을 여러 요청이 동시에 로드하지 않도록 이름별 잠금
+        with load_lock:
+            with self._lock:
+                if name in self._loaded:
+                    self._loaded.move_to_end(name)
+                    return self._loaded[name][0]
+
+            print(f"📦 모델 로딩: {name}")
+            obj = self._loaders[name]()
+            nbytes = model_nbytes(obj)
+
+            with self._lock:
+                self._loaded[name] = (obj, nbytes)
+                self._evict(keep=name)
+            return obj
+
+    def _evict(self, keep: str) -> None:
+        total = sum(n for _, n in self._loaded.values())
+        for name in list(self._loaded):
+            if total <= self.budget_bytes:
+                break
+            if name == keep:
+                continue
+            _, nbytes = self._loaded.pop(name)
+            total -= nbytes
+            print(f"🧹 메모리 예산 초과로 모델 내림: {name}")
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def unload(self, name: str) -> None:
+        with self._lock:
+            self._loaded.pop(name, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            loaded = {name: round(n / 1024 / 1024, 1) for name, (_, n) in self._loaded.items()}
+        return {
+            "budget_mb": self.budget_bytes // (1024 * 1024),
+            "loaded_mb": loaded,
+            "registered": sorted(self._loaders),
+        }
+
+
+# 프로세스 전역 레지스트리 (이 모듈을 import 하는 모든 앱이 공유)
+registry = ModelRegistry()
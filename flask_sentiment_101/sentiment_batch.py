@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+
+import torch
+from transformers import pipeline
+
+from model_registry import pipeline_device, registry
+from sentiment_cache import SentimentCache, text_key
+
+
+# =====================================================
+# 대량 감성분석 (배치)
+# -----------------------------------------------------
+# - 텍스트를 길이순으로 정렬해 비슷한 길이끼리 묶고, 토크나이저에 한 번에 넣어 패딩된 배치로 추론
+# - 입력은 리스트 또는 (JSONL) 스트림, 결과는 입력 순서대로 한 줄씩 (NDJSON)
+# - 정규화 기준으로 같은 문장은 배치 안에서 한 번만 계산하고, 이전 결과는 캐시에서 꺼냄
+#
+# CLI:
+#   python sentiment_batch.py reviews.jsonl -o result.ndjson
+#   cat reviews.txt | python sentiment_batch.py - --batch-size 128
+# =====================================================
+SENTIMENT_MODEL = "tabularisai/multilingual-sentiment-analysis"
+BATCH_SIZE = int(os.environ.get("SENTIMENT_BATCH_SIZE", 64))
+MAX_BATCH_SIZE = 1024  # 한 번에 모델에 넣는 최대 문장 수 (메모리 보호)
+SORT_WINDOW = 4096   # 이만큼씩 읽어서 길이순 정렬 (스트림 전체를 메모리에 올리지 않음)
+MAX_LENGTH = 512
+
+
+def load_sentiment_pipeline():
+    return pipeline(
+        "text-classification",  # sentiment-analysis 대신 text-classification (이 모델은 이렇게)
+        model=SENTIMENT_MODEL,
+        return_all_scores=False,  # True로 하면 모든 점수 나옴
+        device=pipeline_device()
+    )
+
+
+registry.register(SENTIMENT_MODEL, load_sentiment_pipeline)
+cache = SentimentCache()
+
+
+def check_batch_size(batch_size: int) -> None:
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size 는 1~{MAX_BATCH_SIZE} 사이여야 합니다. (받은 값: {batch_size})")
+
+
+def classify_texts(texts: list[str], batch_size: int = BATCH_SIZE) -> list[dict]:
+    """texts → [{"label": ..., "score": ...}, ...] (입력 순서 유지, score는 0~1)"""
+    check_batch_size(batch_size)
+    keys = [text_key(t) for t in texts]
+    found = cache.get_many(list(dict.fromkeys(keys)))
+
+    # 캐시에 없는 문장만, 같은 문장은 하나만 모델에 넣는다
+    todo: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in todo:
+            todo[key] = text
+
+    if todo:
+        preds = _run_model(list(todo.values()), batch_size)
+        computed = dict(zip(todo.keys(), preds))
+        cache.put_many(computed)
+        found.update(computed)
+
+    hits = sum(1 for k in keys if k not in todo)
+    cache.record(lookups=len(keys), hits=hits, dedup_hits=len(keys) - hits - len(todo))
+    return [found[k] for k in keys]
+
+
+def _run_model(texts: list[str], batch_size: int) -> list[dict]:
+    clf = registry.get(SENTIMENT_MODEL)
+    tokenizer, model = clf.tokenizer, clf.model
+    id2label = model.config.id2label
+
+    # 길이순 정렬 → 배치 안의 패딩 최소화
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    results: list[dict | None] = [None] * len(texts)
+
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        enc = tokenizer(
+            [texts[i] for i in idx],
+            padding=True,
+            truncation=True,
+            max_length=MAX_LENGTH,
+            return_tensors="pt"
+        ).to(model.device)
+
+        with torch.inference_mode():
+            probs = model(**enc).logits.softmax(dim=-1)
+        scores, label_ids = probs.max(dim=-1)
+
+        for i, score, label_id in zip(idx, scores.tolist(), label_ids.tolist()):
+            results[i] = {"label": id2label[label_id], "score": round(score, 4)}
+
+    # 빈 결과가 캐시에 들어가면 이후 같은 문장 요청이 계속 깨지므로 여기서 실패
+    missing = sum(r is None for r in results)
+    if missing:
+        raise RuntimeError(f"{missing}개 문장의 결과가 없습니다.")
+    return results
+
+
+def classify_stream(texts, batch_size: int = BATCH_SIZE, window: int = SORT_WINDOW):
+    # 스트림을 window 단위로 잘라 처리하면서 결과를 입력 순서대로 하나씩 yield
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, window))
+        if not chunk:
+            return
+        yield from classify_texts(chunk, batch_size)
+
+
+# --------------------------------
+# JSONL / 텍스트 줄 입력
+# --------------------------------
+def parse_line(line: str, field: str = "text"):
+    # {"text": "..."} 또는 "..." 또는 그냥 텍스트 한 줄
+    line = line.strip()
+    if not line:
+        return None
+    if line[0] in "{\"":
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            return {field: line}
+        return obj if isinstance(obj, dict) else {field: str(obj)}
+    return {field: line}
+
+
+def iter_records(lines, field: str = "text"):
+    for line in lines:
+        rec = parse_line(line, field)
+        if rec is not None:
+            yield rec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대량 감성분석 (JSONL/텍스트 → NDJSON)")
+    parser.add_argument("input", help="입력 파일 (JSONL 또는 한 줄에 한 문장), '-' 이면 stdin")
+    parser.add_argument("-o", "--output", default="-", help="출력 NDJSON 파일, 기본 stdout")
+    parser.add_argument("--field", default="text", help="JSONL 에서 텍스트가 들어 있는 키")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--window", type=int, default=SORT_WINDOW)
+    args = parser.parse_args()
+    try:
+        check_batch_size(args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    start = time.perf_counter()
+    count = 0
+    try:
+        records = iter_records(src, args.field)
+        while True:
+            chunk = list(islice(records, args.window))
+            if not chunk:
+                break
+            texts = [str(r.get(args.field, "")) for r in chunk]
+            for rec, pred in zip(chunk, classify_texts(texts, args.batch_size)):
+                dst.write(json.dumps({**rec, **pred}, ensure_ascii=False) + "\n")
+            count += len(chunk)
+
+            elapsed = time.perf_counter() - start
+            print(f"… {count} texts, {count / elapsed:.1f} texts/sec", file=sys.stderr)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {count} texts in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.1f} texts/sec)", file=sys.stderr)
+    print(f"📊 cache: {cache.stats()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+# =====================================================
+# 문장 단위 감성분석 결과 캐시
+# -----------------------------------------------------
+# - 정규화(NFKC, 소문자, 공백/반복문자/끝 문장부호 정리) 후 해시 → "배송 빨라요!!" == "배송  빨라요"
+# - 메모리 LRU + TTL, SENTIMENT_CACHE_DB 를 주면 SQLite 에도 저장 (재시작 후에도 유지)
+# - hit / miss / 배치 내 중복 제거 수를 세어 hit rate 를 메트릭으로 노출
+# =====================================================
+CACHE_MAX_ENTRIES = int(os.environ.get("SENTIMENT_CACHE_MAX_ENTRIES", 200_000))
+CACHE_TTL_SECONDS = int(os.environ.get("SENTIMENT_CACHE_TTL", 7 * 24 * 3600))
+CACHE_DB_PATH = os.environ.get("SENTIMENT_CACHE_DB")  # 없으면 메모리만
+
+_SPACES = re.compile(r"\s+")
+_REPEATS = re.compile(r"(.)\1{2,}")          # ㅋㅋㅋㅋㅋ → ㅋㅋ, !!!! → !!
+_TRAILING_PUNCT = re.compile(r"[\s.!?~…]+$")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _SPACES.sub(" ", text).strip()
+    text = _REPEATS.sub(r"\1\1", text)
+    return _TRAILING_PUNCT.sub("", text)
+
+
+def text_key(text: str) -> str:
+    return hashlib.blake2b(normalize(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SentimentCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: int = CACHE_TTL_SECONDS,
+                 db_path: str | None = CACHE_DB_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._data: OrderedDict[str, tuple[dict, float]] = OrderedDict()  # key -> (결과, 만료 시각)
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.dedup_hits = 0
+
+        if db_path:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS sentiment_cache (
+                        key TEXT PRIMARY KEY,
+                        label TEXT NOT NULL,
+                        score REAL NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get_many(self, keys) -> dict[str, dict]:
+        now = time.time()
+        found: dict[str, dict] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                value, expires_at = entry
+                if expires_at < now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+
+        missing = [k for k in keys if k not in found]
+        if self.db_path and missing:
+            with self._connect() as conn:
+                for i in range(0, len(missing), 500):
+                    part = missing[i:i + 500]
+                    rows = conn.execute(
+                        f"SELECT key, label, score, expires_at FROM sentiment_cache "
+                        f"WHERE key IN ({','.join('?' * len(part))}) AND expires_at >= ?",
+                        (*part, now),
+                    ).fetchall()
+                    for key, label, score, expires_at in rows:
+                        found[key] = {"label": label, "score": score}
+                        self._put_memory(key, found[key], expires_at)
+        return found
+
+    def _put_memory(self, key: str, value: dict, expires_at: float) -> None:
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def put_many(self, items: dict[str, dict]) -> None:
+        # label/score 가 다 있는 결과만 저장 (빈/부분 결과는 저장하지 않음)
+        items = {k: v for k, v in items.items() if isinstance(v, dict) and "label" in v and "score" in v}
+        expires_at = time.time() + self.ttl
+        for key, value in items.items():
+            self._put_memory(key, value, expires_at)
+
+        if self.db_path and items:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sentiment_cache (key, label, score, expires_at) VALUES (?, ?, ?, ?)",
+                    [(k, v["label"], v["score"], expires_at) for k, v in items.items()],
+                )
+
+    def record(self, lookups: int, hits: int, dedup_hits: int) -> None:
+        with self._lock:
+            self.lookups += lookups
+            self.hits += hits
+            self.dedup_hits += dedup_hits
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.hits + self.dedup_hits
+            return {
+                "lookups": self.lookups,
+                "cache_hits": self.hits,
+                "dedup_hits": self.dedup_hits,
+                "model_runs": self.lookups - served,
+                "hit_rate": round(served / self.lookups, 4) if self.lookups else 0.0,
+                "entries": len(self._data),
+            }
@@ -0,0 +1,45 @@
+from flask import Flask, jsonify
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.serving import run_simple
+
+import app as sentiment_app
+import app_summarize
+import summarization_app
+from model_registry import registry
+
+# =====================================================
+# 여러 앱을 한 프로세스에서 실행
+# -----------------------------------------------------
+# 각 앱은 import 시점에 모델을 로드하지 않고 레지스트리에 등록만 하므로 시작이 빠르고,
+# 모델은 첫 요청 때 로드되어 MODEL_RAM_BUDGET_MB 안에서 앱끼리 공유된다.
+# (가중치 공유는 이 프로세스 안에서만. flask_summarization/app.py 는 따로 띄우므로 공유하지 않음)
+#
+#   python serve_all.py
+#   → /sentiment/  감성분석
+#   → /summarize/  텍스트 요약 (KoBART)
+#   → /pdf/        PDF 요약 (KoT5)
+# =====================================================
+MOUNTS = {
+    "/sentiment": sentiment_app.app,
+    "/summarize": app_summarize.app,
+    "/pdf": summarization_app.app,
+}
+
+root = Flask(__name__)
+
+
+@root.route("/")
+def index():
+    links = "".join(f'<li><a href="{path}/">{path}</a></li>' for path in MOUNTS)
+    return f"<h1>Flask 101 apps</h1><ul>{links}</ul>"
+
+
+@root.route("/models")
+def models():
+    return jsonify(registry.stats())
+
+
+application = DispatcherMiddleware(root, MOUNTS)
+
+if __name__ == "__main__":
+    run_simple("0.0.0.0", 5001, application, threaded=True)
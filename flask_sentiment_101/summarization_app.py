@@ -1,31 +1,53 @@
 import os
+import json
 import torch
-from flask import Flask, render_template, request
+from flask import Flask, Response, render_template, request
+from werkzeug.exceptions import RequestEntityTooLarge
 from pypdf import PdfReader
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import TextIteratorStreamer
+
+from batching import BatchingWorker
+from inference_backend import DEFAULT_BACKEND, load_seq2seq, pick_device
+from model_registry import registry
+from uploads import MAX_UPLOAD_BYTES, use_spooled_uploads
 
 # ----------------------
 # Config
 # ----------------------
-UPLOAD_DIR = "uploads"
 MODEL_NAME = "psyche/KoT5-base-korean-summarization"
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
+GEN_PARAMS = {"max_length": 256, "min_length": 80, "num_beams": 4}
+
+# 스트리밍(SSE) 요약: 토큰을 하나씩 내보내려면 beam search 대신 greedy / sampling
+STREAM_PARAMS = {**GEN_PARAMS, "num_beams": 1}
+SAMPLING_PARAMS = {"do_sample": True, "top_p": 0.9, "temperature": 0.7}
+STREAM_TIMEOUT = 300  # 다음 토큰을 기다리는 최대 시간(초)
+
+# 동적 배치: 동시에 들어온 요청들을 잠깐 모아 한 번에 generate
+MAX_BATCH = int(os.environ.get("SUMMARY_MAX_BATCH", 8))
+MAX_WAIT_MS = float(os.environ.get("SUMMARY_MAX_WAIT_MS", 10))
+
+# 추론 백엔드: eager / int8 / compile / onnx (환경변수 SUMMARY_BACKEND)
+BACKEND = DEFAULT_BACKEND
+device = pick_device(BACKEND)
+
+# 업로드는 디스크에 저장하지 않고 스풀(메모리 → 넘치면 임시파일)에서 바로 파싱
+MAX_UPLOAD_MB = int(os.environ.get("SUMMARY_MAX_UPLOAD_MB", MAX_UPLOAD_BYTES // (1024 * 1024)))
 
 app = Flask(__name__)
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+use_spooled_uploads(app, max_upload_bytes=MAX_UPLOAD_MB * 1024 * 1024)
 
 # ----------------------
-# Load Model (1회)
+# Load Model (첫 사용 때 1회, 같은 프로세스의 앱끼리 공유)
 # ----------------------
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).to(device)
+registry.register(MODEL_NAME, lambda: load_seq2seq(MODEL_NAME, BACKEND, device))
 
 # ----------------------
 # PDF → Text
 # ----------------------
-def extract_text_from_pdf(pdf_path):
-    reader = PdfReader(pdf_path)
+def extract_text_from_pdf(pdf_file):
+    # 경로 또는 file-like(업로드 스트림) 모두 가능
+    reader = PdfReader(pdf_file)
     texts = []
     for page in reader.pages:
         text = page.extract_text()
@@ -36,22 +58,74 @@ def extract_text_from_pdf(pdf_path):
 # ----------------------
 # Summarization
 # ----------------------
+def generate_batch(id_lists, key):
+    # 배치 워커 스레드에서만 호출됨 (key = generate 파라미터)
+    # 길이순 정렬 → 패딩 최소화, 결과는 원래 순서로
+    tokenizer, model = registry.get(MODEL_NAME)
+    order = sorted(range(len(id_lists)), key=lambda i: len(id_lists[i]))
+    batch = tokenizer.pad(
+        {"input_ids": [id_lists[i] for i in order]},
+        return_tensors="pt"
+    ).to(device)
+
+    with torch.no_grad():
+        summary_ids = model.generate(
+            **batch,
+            **dict(key),
+            early_stopping=True
+        )
+
+    outputs = [""] * len(id_lists)
+    for i, summary in zip(order, tokenizer.batch_decode(summary_ids, skip_special_tokens=True)):
+        outputs[i] = summary
+    return outputs
+
+
+batcher = BatchingWorker(generate_batch, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, name="summary-batcher")
+
+
 def summarize_text(text):
+    tokenizer, _ = registry.get(MODEL_NAME)
+    ids = tokenizer(
+        text[:3000],
+        truncation=True
+    )["input_ids"]
+
+    return batcher.run([ids], key=tuple(sorted(GEN_PARAMS.items())))[0]
+
+
+def stream_summary(text, sampling=False):
+    # 요약 결과를 디코딩되는 대로 조금씩 yield
+    if not text.strip():
+        yield "요약할 텍스트가 없습니다."
+        return
+
+    params = dict(STREAM_PARAMS)
+    if sampling:
+        params.update(SAMPLING_PARAMS)
+
+    tokenizer, model = registry.get(MODEL_NAME)
     inputs = tokenizer(
         text[:3000],
         return_tensors="pt",
         truncation=True
     ).to(device)
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True, timeout=STREAM_TIMEOUT)
 
-    summary_ids = model.generate(
-        **inputs,
-        max_length=256,
-        min_length=80,
-        num_beams=4,
-        early_stopping=True
-    )
+    def _generate():
+        try:
+            with torch.no_grad():
+                model.generate(**inputs, **params, streamer=streamer)
+        except Exception:
+            streamer.end()
+            raise
 
-    return tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+    # generate 는 배치 워커 스레드에서 (모델을 만지는 스레드는 하나), 여기서는 토큰만 받아 흘림
+    done = batcher.call(_generate)
+    for piece in streamer:
+        if piece:
+            yield piece
+    done.result()  # generate 가 실패했으면 여기서 예외
 
 # ----------------------
 # Routes
@@ -62,13 +136,48 @@ def index():
     if request.method == "POST":
         file = request.files.get("pdf")
         if file and file.filename.endswith(".pdf"):
-            path = os.path.join(UPLOAD_DIR, file.filename)
-            file.save(path)
-
-            text = extract_text_from_pdf(path)
+            text = extract_text_from_pdf(file.stream)
             summary = summarize_text(text)
 
-    return render_template("index.html", summary=summary)
+    return render_template("pdf_summary.html", summary=summary)
+
+
+def sse(event, data):
+    # Server-Sent Events 한 건 (줄바꿈이 섞여도 깨지지 않게 JSON 문자열로)
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route("/stream", methods=["POST"])
+def stream():
+    file = request.files.get("pdf")
+    sampling = request.form.get("decoding") == "sample"
+
+    if not (file and file.filename.endswith(".pdf")):
+        return Response(sse("error", "PDF 파일을 선택하세요."), mimetype="text/event-stream")
+
+    # 업로드 스트림은 요청이 끝나면 닫히므로 텍스트는 응답 시작 전에 뽑아 둔다
+    text = extract_text_from_pdf(file.stream)
+
+    def events():
+        try:
+            for piece in stream_summary(text, sampling=sampling):
+                yield sse("token", piece)
+        except Exception as e:
+            yield sse("error", str(e))
+            return
+        yield sse("done", "")
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    summary = f"파일이 너무 큽니다. (최대 {MAX_UPLOAD_MB}MB)"
+    return render_template("pdf_summary.html", summary=summary), 413
 
 if __name__ == "__main__":
     app.run(debug=True)
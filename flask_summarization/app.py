@@ -1,33 +1,77 @@
 import os
+import json
 import torch
-from flask import Flask, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
+from werkzeug.exceptions import RequestEntityTooLarge
 from pypdf import PdfReader
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import TextIteratorStreamer
+
+from assisted_decoding import ASSIST_MODE, ASSIST_SUMMARY_TYPES, assist_config, assisted_params, load_assistant
+from batching import BatchingWorker
+from inference_backend import DEFAULT_BACKEND, load_seq2seq, pick_device
+from model_registry import registry
+from summary_cache import SummaryCache, make_key
+from uploads import MAX_UPLOAD_BYTES, upload_sha256, use_spooled_uploads
 
 # --------------------------------
 # Config
 # --------------------------------
-UPLOAD_DIR = "uploads"
 MODEL_NAME = "lcw99/t5-base-korean-text-summary"
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
+# 요약 길이 옵션 (generate 파라미터)
+SUMMARY_PARAMS = {
+    "short": {"max_length": 200, "min_length": 60, "num_beams": 2},
+    "long": {"max_length": 400, "min_length": 150, "num_beams": 4},
+}
+
+# 스트리밍(SSE) 요약: 토큰을 하나씩 내보내려면 beam search 대신 greedy / sampling
+STREAM_PARAMS = {k: {**v, "num_beams": 1} for k, v in SUMMARY_PARAMS.items()}
+SAMPLING_PARAMS = {"do_sample": True, "top_p": 0.9, "temperature": 0.7}
+STREAM_TIMEOUT = 300  # 다음 토큰을 기다리는 최대 시간(초)
+
+# 긴 문서 요약 (map-reduce)
+CHUNK_TOKENS = 480          # 청크 하나의 입력 토큰 수 (T5 입력 한계 512 안쪽)
+CHUNK_OVERLAP_TOKENS = 32   # 청크 경계에서 문장이 잘리는 것 완화
+MAP_PARAMS = {"max_length": 128, "min_length": 30, "num_beams": 2}  # 청크 요약은 짧게
+GEN_BATCH_SIZE = 8          # generate 한 번에 넣을 청크 수
+MAX_REDUCE_LEVELS = 12      # 안전장치: 단계마다 ~3.5배 줄어서 보통은 log(길이) 단계 안에 끝남
+
+# 동적 배치: 동시에 들어온 요청들을 잠깐 모아 한 번에 generate
+MAX_BATCH = int(os.environ.get("SUMMARY_MAX_BATCH", GEN_BATCH_SIZE))
+MAX_WAIT_MS = float(os.environ.get("SUMMARY_MAX_WAIT_MS", 10))
+
+# 요약 결과 캐시 (디스크 LRU)
+CACHE_DB_PATH = "summary_cache.db"
+CACHE_MAX_MB = int(os.environ.get("SUMMARY_CACHE_MAX_MB", 200))
+
+# 추론 백엔드: eager / int8 / compile / onnx (환경변수 SUMMARY_BACKEND)
+BACKEND = DEFAULT_BACKEND
+device = pick_device(BACKEND)
+
+# assisted generation (draft 모델): 환경변수 SUMMARY_ASSIST / SUMMARY_DRAFT_MODEL
+# 켜면 long 요약은 beam search 대신 assisted greedy 로, 배치 워커 스레드에서 한 건씩 generate
+ASSISTANT_NAME = f"{MODEL_NAME}:assistant"
+
+# 업로드는 디스크에 저장하지 않고 스풀(메모리 → 넘치면 임시파일)에서 바로 파싱
+MAX_UPLOAD_MB = int(os.environ.get("SUMMARY_MAX_UPLOAD_MB", MAX_UPLOAD_BYTES // (1024 * 1024)))
 
 app = Flask(__name__)
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+use_spooled_uploads(app, max_upload_bytes=MAX_UPLOAD_MB * 1024 * 1024)
+
+cache = SummaryCache(CACHE_DB_PATH, max_bytes=CACHE_MAX_MB * 1024 * 1024)
 
 # --------------------------------
-# Load model (ONCE)
+# Load model (첫 사용 때 1회, 같은 프로세스의 앱끼리 공유 - 이 앱은 단독 실행이라 자기 프로세스 안에서만)
 # --------------------------------
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
-model.to(device)
-model.eval()
+registry.register(MODEL_NAME, lambda: load_seq2seq(MODEL_NAME, BACKEND, device))
+registry.register(ASSISTANT_NAME, lambda: load_assistant(*registry.get(MODEL_NAME), device=device))
 
 # --------------------------------
 # PDF → Text
 # --------------------------------
-def extract_text_from_pdf(pdf_path: str) -> str:
-    reader = PdfReader(pdf_path)
+def extract_text_from_pdf(pdf_file) -> str:
+    # 경로 또는 file-like(업로드 스트림) 모두 가능
+    reader = PdfReader(pdf_file)
     texts = []
     for page in reader.pages:
         t = page.extract_text()
@@ -38,36 +82,162 @@ def extract_text_from_pdf(pdf_path: str) -> str:
 # --------------------------------
 # Text Summarization
 # --------------------------------
+def encode(text: str) -> list[int]:
+    # 길이 제한 없이 전체 토큰화 (잘라내는 건 청크 단계에서)
+    tokenizer, _ = registry.get(MODEL_NAME)
+    return tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"]
+
+
+def split_token_ids(ids: list[int]) -> list[list[int]]:
+    step = CHUNK_TOKENS - CHUNK_OVERLAP_TOKENS
+    return [ids[i:i + CHUNK_TOKENS] for i in range(0, len(ids), step)]
+
+
+def generate_batch(id_lists: list[list[int]], params: dict) -> list[str]:
+    # 길이순으로 정렬해서 비슷한 길이끼리 배치 → 패딩 낭비 최소화, 결과는 원래 순서로
+    tokenizer, model = registry.get(MODEL_NAME)
+    order = sorted(range(len(id_lists)), key=lambda i: len(id_lists[i]))
+    outputs = [""] * len(id_lists)
+
+    for start in range(0, len(order), GEN_BATCH_SIZE):
+        idx = order[start:start + GEN_BATCH_SIZE]
+        batch = tokenizer.pad(
+            {"input_ids": [tokenizer.build_inputs_with_special_tokens(id_lists[i]) for i in idx]},
+            return_tensors="pt",
+        ).to(device)
+
+        with torch.no_grad():
+            output_ids = model.generate(**batch, **params, early_stopping=True)
+
+        for i, summary in zip(idx, tokenizer.batch_decode(output_ids, skip_special_tokens=True)):
+            outputs[i] = summary
+
+    return outputs
+
+
+def _run_batch(id_lists: list[list[int]], key: tuple) -> list[str]:
+    # 배치 워커 스레드에서만 호출됨 (key = generate 파라미터)
+    return generate_batch(id_lists, dict(key))
+
+
+batcher = BatchingWorker(_run_batch, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, name="summary-batcher")
+
+
+def generate_many(id_lists: list[list[int]], params: dict) -> list[str]:
+    # 다른 요청의 같은 파라미터 청크와 묶여 배치로 돌도록 워커에 맡기고 기다림
+    return batcher.run(id_lists, key=tuple(sorted(params.items())))
+
+
+def reduce_to_fit(text: str) -> list[int]:
+    # 한 번에 못 넣는 길이면: 청크별 요약(map, 배치) → 요약들을 이어 붙여 다시 요약(reduce)
+    # 단계마다 길이가 몇 분의 1로 줄어서 전체 비용은 문서 길이에 선형
+    # 들어갈 때까지 반복 (단계 수는 길이의 log 에 비례)
+    ids = encode(text)
+    for _ in range(MAX_REDUCE_LEVELS):
+        if len(ids) <= CHUNK_TOKENS:
+            return ids
+        partials = generate_many(split_token_ids(ids), MAP_PARAMS)
+        reduced = encode("\n".join(partials))
+        if len(reduced) >= len(ids):
+            # 요약해도 줄지 않으면 더 돌아도 소용없음
+            ids = reduced
+            break
+        ids = reduced
+
+    if len(ids) > CHUNK_TOKENS:
+        app.logger.warning(
+            "reduce_to_fit: %d 토큰이 남아 앞 %d 토큰만 사용합니다 (뒷부분 잘림)", len(ids), CHUNK_TOKENS
+        )
+    return ids[:CHUNK_TOKENS]
+
+
+def use_assistant(summary_type: str) -> bool:
+    return ASSIST_MODE != "off" and summary_type in ASSIST_SUMMARY_TYPES
+
+
+def generate_assisted(ids: list[int], params: dict) -> str:
+    # assisted generation 은 batch 1 만 지원 → 다른 요청과 묶지 않고, 모델은 배치 워커 스레드에서만
+    assist_kwargs = registry.get(ASSISTANT_NAME)
+    if not assist_kwargs:
+        # draft 모델을 못 올렸으면 평소처럼 beam search 배치로
+        return generate_many([ids], params)[0]
+
+    def _generate():
+        tokenizer, model = registry.get(MODEL_NAME)
+        inputs = tokenizer.pad(
+            {"input_ids": [tokenizer.build_inputs_with_special_tokens(ids)]},
+            return_tensors="pt",
+        ).to(device)
+        with torch.no_grad():
+            output_ids = model.generate(**inputs, **assisted_params(params, assist_kwargs))
+        return tokenizer.decode(output_ids[0], skip_special_tokens=True)
+
+    return batcher.call(_generate).result()
+
+
 def summarize_text(text: str, summary_type: str = "short") -> str:
     if not text.strip():
         return "요약할 텍스트가 없습니다."
 
-    # 요약 길이 옵션
-    if summary_type == "long":
-        max_len = 400
-        min_len = 150
-        beams = 4
-    else:  # short
-        max_len = 200
-        min_len = 60
-        beams = 2
-
-    inputs = tokenizer(
-        text[:3000],  # 길이 제한
+    params = SUMMARY_PARAMS.get(summary_type, SUMMARY_PARAMS["short"])
+    if use_assistant(summary_type):
+        return generate_assisted(reduce_to_fit(text), params)
+    return generate_many([reduce_to_fit(text)], params)[0]
+
+
+def stream_summary(text: str, summary_type: str = "short", sampling: bool = False):
+    """
+    요약 결과를 디코딩되는 대로 조금씩 yield
+    (앞 단계 청크 요약은 배치로 끝내고, 마지막 요약만 토큰 스트리밍)
+    """
+    if not text.strip():
+        yield "요약할 텍스트가 없습니다."
+        return
+
+    params = dict(STREAM_PARAMS.get(summary_type, STREAM_PARAMS["short"]))
+    if sampling:
+        params.update(SAMPLING_PARAMS)
+    elif use_assistant(summary_type) and registry.get(ASSISTANT_NAME):
+        params = assisted_params(params, registry.get(ASSISTANT_NAME))
+
+    ids = reduce_to_fit(text)
+    tokenizer, model = registry.get(MODEL_NAME)
+    inputs = tokenizer.pad(
+        {"input_ids": [tokenizer.build_inputs_with_special_tokens(ids)]},
         return_tensors="pt",
-        truncation=True
     ).to(device)
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True, timeout=STREAM_TIMEOUT)
 
-    with torch.no_grad():
-        output_ids = model.generate(
-            **inputs,
-            max_length=max_len,
-            min_length=min_len,
-            num_beams=beams,
-            early_stopping=True
-        )
+    def _generate():
+        try:
+            with torch.no_grad():
+                model.generate(**inputs, **params, streamer=streamer)
+        except Exception:
+            streamer.end()
+            raise
+
+    # generate 는 배치 워커 스레드에서 (모델을 만지는 스레드는 하나), 여기서는 토큰만 받아 흘림
+    done = batcher.call(_generate)
+    for piece in streamer:
+        if piece:
+            yield piece
+    done.result()  # generate 가 실패했으면 여기서 예외
 
-    return tokenizer.decode(output_ids[0], skip_special_tokens=True)
+
+def summary_cache_key(file_hash: str, summary_type: str, stream: bool = False) -> str:
+    # 결과에 영향을 주는 설정은 모두 key에 넣는다 (바꾸면 자연히 새로 계산)
+    summary_params = STREAM_PARAMS if stream else SUMMARY_PARAMS
+    params = {
+        "summary": summary_params.get(summary_type, summary_params["short"]),
+        "stream": stream,
+        "backend": BACKEND,  # int8 등은 결과가 조금 달라질 수 있음
+        "assist": assist_config() if use_assistant(summary_type) else {"mode": "off"},
+        "map": MAP_PARAMS,
+        "chunk_tokens": CHUNK_TOKENS,
+        "chunk_overlap": CHUNK_OVERLAP_TOKENS,
+        "max_reduce_levels": MAX_REDUCE_LEVELS,
+    }
+    return make_key(file_hash, MODEL_NAME, summary_type, params)
 
 # --------------------------------
 # Routes
@@ -80,14 +250,74 @@ def index():
         summary_type = request.form.get("summary_type", "short")
 
         if file and file.filename.endswith(".pdf"):
-            save_path = os.path.join(UPLOAD_DIR, file.filename)
-            file.save(save_path)
+            # 업로드 받으면서 계산된 해시로 캐시 조회 → 있으면 추출/generate 모두 생략
+            key = summary_cache_key(upload_sha256(file), summary_type)
+            summary = cache.get(key)
 
-            text = extract_text_from_pdf(save_path)
-            summary = summarize_text(text, summary_type)
+            if summary is None:
+                text = extract_text_from_pdf(file.stream)
+                summary = summarize_text(text, summary_type)
+                cache.put(key, summary)
 
     return render_template("index.html", summary=summary)
 
+
+def sse(event: str, data: str) -> str:
+    # Server-Sent Events 한 건 (줄바꿈이 섞여도 깨지지 않게 JSON 문자열로)
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route("/stream", methods=["POST"])
+def stream():
+    file = request.files.get("pdf")
+    summary_type = request.form.get("summary_type", "short")
+    sampling = request.form.get("decoding") == "sample"
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if not (file and file.filename.endswith(".pdf")):
+        return Response(sse("error", "PDF 파일을 선택하세요."), mimetype="text/event-stream")
+
+    # greedy 결과는 항상 같으므로 캐시 사용 (sampling은 매번 새로)
+    key = summary_cache_key(upload_sha256(file), summary_type, stream=True)
+    cached = None if sampling else cache.get(key)
+    if cached is not None:
+        return Response(sse("token", cached) + sse("done", ""), mimetype="text/event-stream", headers=headers)
+
+    # 업로드 스트림은 요청이 끝나면 닫히므로 텍스트는 응답 시작 전에 뽑아 둔다
+    text = extract_text_from_pdf(file.stream)
+
+    def events():
+        parts = []
+        try:
+            for piece in stream_summary(text, summary_type, sampling=sampling):
+                parts.append(piece)
+                yield sse("token", piece)
+        except Exception as e:
+            yield sse("error", str(e))
+            return
+
+        if not sampling:
+            cache.put(key, "".join(parts))
+        yield sse("done", "")
+
+    return Response(events(), mimetype="text/event-stream", headers=headers)
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    summary = f"파일이 너무 큽니다. (최대 {MAX_UPLOAD_MB}MB)"
+    return render_template("index.html", summary=summary), 413
+
+
+@app.route("/cache/stats")
+def cache_stats():
+    return jsonify(cache.stats())
+
+
+@app.route("/models/stats")
+def model_stats():
+    return jsonify(registry.stats())
+
 # --------------------------------
 if __name__ == "__main__":
     app.run(debug=True)
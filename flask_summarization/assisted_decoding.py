@@ -0,0 +1,81 @@
+import os
+import warnings
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+
+# =====================================================
+# Assisted generation (speculative decoding) 옵션
+# -----------------------------------------------------
+# 작은 draft 모델이 토큰 여러 개를 먼저 제안하고,
+# 본 모델은 forward 한 번으로 그 제안들을 한꺼번에 검증한다.
+# greedy 에서는 본 모델이 직접 한 토큰씩 고른 결과와 토큰 단위로 똑같다.
+#
+# off   : 사용 안 함 (기본)
+# draft : SUMMARY_DRAFT_MODEL 의 작은 seq2seq 모델을 draft 로 사용
+#         (본 모델과 토크나이저/어휘가 같아야 함, 없거나 다르면 경고 후 끔)
+#
+# 기본으로 정해 둔 draft 모델은 없다. 본 모델과 어휘가 같은 작은 모델을 골라
+# bench_assisted.py 로 greedy / beam 대비 지연 시간을 재 보고, 실제로 빨라질 때만 켤 것.
+# (transformers 의 prompt lookup 은 encoder-decoder 모델에서 원문이 아니라
+#  지금까지 생성한 요약 안에서 n-gram 을 찾으므로 요약에는 맞지 않아 쓰지 않는다)
+#
+# beam search 와는 같이 쓸 수 없으므로, 켜면 해당 요약 모드는 greedy(num_beams=1)로 돈다.
+# =====================================================
+ASSIST_MODES = ("off", "draft")
+ASSIST_MODE = os.environ.get("SUMMARY_ASSIST", "off")
+DRAFT_MODEL_NAME = os.environ.get("SUMMARY_DRAFT_MODEL", "")
+ASSIST_SUMMARY_TYPES = ("long",)  # 가장 느린 경로(긴 요약)에만 적용
+
+
+def check_vocab_compatible(tokenizer, draft_tokenizer) -> None:
+    # draft 가 제안한 토큰 id 를 본 모델이 그대로 검증하므로 어휘와 특수 토큰이 완전히 같아야 함
+    if tokenizer.get_vocab() != draft_tokenizer.get_vocab():
+        raise ValueError("draft 모델의 어휘가 본 모델과 다릅니다.")
+    for attr in ("pad_token_id", "eos_token_id", "unk_token_id"):
+        if getattr(tokenizer, attr) != getattr(draft_tokenizer, attr):
+            raise ValueError(f"draft 모델의 {attr} 가 본 모델과 다릅니다.")
+
+
+def load_draft_model(draft_name: str, tokenizer, device: str = "cpu"):
+    draft_tokenizer = AutoTokenizer.from_pretrained(draft_name)
+    check_vocab_compatible(tokenizer, draft_tokenizer)
+
+    draft = AutoModelForSeq2SeqLM.from_pretrained(draft_name)
+    draft.eval()
+    return draft.to(device)
+
+
+def load_assistant(tokenizer, model, mode: str = ASSIST_MODE, draft_name: str = DRAFT_MODEL_NAME,
+                   device: str = "cpu") -> dict:
+    """generate() 에 더해 줄 인자 반환 ({} 이면 assisted generation 사용 안 함)"""
+    if mode not in ASSIST_MODES:
+        raise ValueError(f"지원하지 않는 assisted 모드: {mode} (가능: {', '.join(ASSIST_MODES)})")
+    if mode == "off":
+        return {}
+    if not isinstance(model, torch.nn.Module):
+        # ONNX Runtime 모델 등은 transformers 의 assisted generate 를 지원하지 않음
+        warnings.warn("PyTorch 백엔드가 아니라 assisted generation 을 끕니다.")
+        return {}
+
+    if not draft_name:
+        warnings.warn("SUMMARY_DRAFT_MODEL 이 없어 assisted generation 을 끕니다.")
+        return {}
+    try:
+        return {"assistant_model": load_draft_model(draft_name, tokenizer, device)}
+    except (OSError, ValueError) as e:
+        warnings.warn(f"draft 모델을 쓸 수 없어 assisted generation 을 끕니다: {e}")
+        return {}
+
+
+def assisted_params(params: dict, assist_kwargs: dict) -> dict:
+    # assisted generation 은 batch 1, greedy/sampling 에서만 동작
+    return {**params, "num_beams": 1, **assist_kwargs}
+
+
+def assist_config(mode: str = ASSIST_MODE, draft_name: str = DRAFT_MODEL_NAME) -> dict:
+    # 캐시 key 등에 넣을 설정값 (모델 객체 제외)
+    if mode == "off":
+        return {"mode": "off"}
+    return {"mode": mode, "draft": draft_name}
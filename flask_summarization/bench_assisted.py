@@ -0,0 +1,90 @@
+import argparse
+import statistics
+import time
+
+import torch
+
+from assisted_decoding import DRAFT_MODEL_NAME, load_draft_model
+from bench_backend import CORPUS_PATH, MAX_INPUT_TOKENS, MODEL_NAME, load_corpus
+from inference_backend import load_seq2seq
+
+
+# =====================================================
+# Assisted generation 벤치마크 (CPU)
+# -----------------------------------------------------
+# app.py 의 long 요약 설정으로 bench/corpus.jsonl 을 요약해서
+# - beam (num_beams=4, 현재 기본)
+# - greedy
+# - greedy + draft 모델 (--draft 또는 SUMMARY_DRAFT_MODEL 이 있을 때)
+# 의 문서당 지연 시간과, greedy 대비 출력 토큰이 완전히 같은지 비교한다.
+#
+#   python bench_assisted.py --draft <작은 한국어 seq2seq 모델>
+# =====================================================
+LONG_PARAMS = {"max_length": 400, "min_length": 150, "num_beams": 4}  # app.py 의 long 과 동일
+GREEDY_PARAMS = {**LONG_PARAMS, "num_beams": 1}
+
+
+def run(tokenizer, model, docs: list[dict], params: dict) -> tuple[list[list[int]], list[float]]:
+    outputs, latencies = [], []
+    for doc in docs:
+        inputs = tokenizer(
+            doc["text"], return_tensors="pt", truncation=True, max_length=MAX_INPUT_TOKENS
+        )
+        start = time.perf_counter()
+        with torch.no_grad():
+            output_ids = model.generate(**inputs, **params)
+        latencies.append(time.perf_counter() - start)
+        outputs.append(output_ids[0].tolist())
+    return outputs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="assisted generation (speculative decoding) 벤치마크")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--draft", default=DRAFT_MODEL_NAME, help="draft seq2seq 모델 (본 모델과 같은 어휘)")
+    parser.add_argument("--warmup", type=int, default=1)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    docs = load_corpus(args.corpus)
+    tokenizer, model = load_seq2seq(args.model, "eager", "cpu")
+
+    configs = [
+        ("beam4", LONG_PARAMS),
+        ("greedy", GREEDY_PARAMS),
+    ]
+    if args.draft:
+        try:
+            draft = load_draft_model(args.draft, tokenizer, "cpu")
+            configs.append(("draft", {**GREEDY_PARAMS, "assistant_model": draft}))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ draft 모델 제외: {e}")
+
+    rows = []
+    reference = None
+    for name, params in configs:
+        print(f"▶ {name} ...")
+        run(tokenizer, model, docs[:args.warmup], params)
+        outputs, lat = run(tokenizer, model, docs, params)
+        if name == "greedy":
+            reference = outputs
+        rows.append((name, outputs, statistics.mean(lat) * 1000))
+
+    base = {name: ms for name, _, ms in rows}
+    print()
+    print(f"{'mode':<8} {'mean(ms)':>9} {'vs beam4':>9} {'vs greedy':>10} {'=greedy':>8}")
+    for name, outputs, ms in rows:
+        same = sum(o == r for o, r in zip(outputs, reference))
+        print(f"{name:<8} {ms:>9.0f} {base['beam4'] / ms:>8.2f}x {base['greedy'] / ms:>9.2f}x "
+              f"{same:>4}/{len(docs)}")
+
+    # greedy 와 토큰이 하나라도 다르면 assisted 구현/설정 문제 → 실패로 종료
+    mismatched = [name for name, outputs, _ in rows
+                  if name not in ("beam4", "greedy") and outputs != reference]
+    if mismatched:
+        raise SystemExit(f"❌ greedy 와 출력이 다른 모드: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import statistics
+import time
+from collections import Counter
+
+import torch
+
+from inference_backend import BACKENDS, load_seq2seq
+
+
+# =====================================================
+# 추론 백엔드 벤치마크
+# -----------------------------------------------------
+# 고정된 로컬 코퍼스(bench/corpus.jsonl)를 백엔드별로 요약해서
+# - 문서당 지연 시간 (mean / p50 / p95)
+# - eager(기준) 요약과의 ROUGE-1/2/L F1 (어절 단위)
+# 을 비교한다.
+#
+#   python bench_backend.py --backends eager int8 compile onnx
+# =====================================================
+MODEL_NAME = "lcw99/t5-base-korean-text-summary"
+CORPUS_PATH = "bench/corpus.jsonl"
+GEN_PARAMS = {"max_length": 200, "min_length": 60, "num_beams": 2}  # app.py 의 short 와 동일
+MAX_INPUT_TOKENS = 512
+
+
+def load_corpus(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --------------------------------
+# ROUGE (외부 패키지 없이 어절 단위)
+# --------------------------------
+def _f1(overlap: int, n_pred: int, n_ref: int) -> float:
+    if not overlap:
+        return 0.0
+    p, r = overlap / n_pred, overlap / n_ref
+    return 2 * p * r / (p + r)
+
+
+def _ngrams(tokens: list[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _lcs(a: list[str], b: list[str]) -> int:
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b, start=1):
+            cur.append(prev[j - 1] + 1 if x == y else max(prev[j], cur[j - 1]))
+        prev = cur
+    return prev[-1]
+
+
+def rouge(pred: str, ref: str) -> dict:
+    p, r = pred.split(), ref.split()
+    scores = {}
+    for n in (1, 2):
+        pn, rn = _ngrams(p, n), _ngrams(r, n)
+        scores[f"rouge{n}"] = _f1(sum((pn & rn).values()), sum(pn.values()), sum(rn.values()))
+    scores["rougeL"] = _f1(_lcs(p, r), len(p), len(r))
+    return scores
+
+
+# --------------------------------
+# Benchmark
+# --------------------------------
+def summarize_all(tokenizer, model, docs: list[dict], device: str) -> tuple[list[str], list[float]]:
+    summaries, latencies = [], []
+    for doc in docs:
+        inputs = tokenizer(
+            doc["text"], return_tensors="pt", truncation=True, max_length=MAX_INPUT_TOKENS
+        ).to(device)
+        start = time.perf_counter()
+        with torch.no_grad():
+            output_ids = model.generate(**inputs, **GEN_PARAMS, early_stopping=True)
+        latencies.append(time.perf_counter() - start)
+        summaries.append(tokenizer.decode(output_ids[0], skip_special_tokens=True))
+    return summaries, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요약 모델 추론 백엔드 벤치마크")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전 예열 문서 수 (compile 등)")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    docs = load_corpus(args.corpus)
+    device = "cpu"  # CPU 호스트 기준 비교
+
+    backends = ["eager"] + [b for b in args.backends if b != "eager"]
+    reference = None
+    rows = []
+
+    for backend in backends:
+        print(f"▶ {backend} 로딩 중...")
+        t0 = time.perf_counter()
+        tokenizer, model = load_seq2seq(args.model, backend, device)
+        load_s = time.perf_counter() - t0
+
+        summarize_all(tokenizer, model, docs[:args.warmup], device)
+        summaries, lat = summarize_all(tokenizer, model, docs, device)
+
+        if reference is None:
+            reference = summaries  # eager 결과가 기준
+        scores = [rouge(s, r) for s, r in zip(summaries, reference)]
+        lat_sorted = sorted(lat)
+        rows.append({
+            "backend": backend,
+            "load_s": load_s,
+            "mean_ms": statistics.mean(lat) * 1000,
+            "p50_ms": lat_sorted[len(lat) // 2] * 1000,
+            "p95_ms": lat_sorted[min(len(lat) - 1, int(len(lat) * 0.95))] * 1000,
+            **{k: statistics.mean(s[k] for s in scores) for k in ("rouge1", "rouge2", "rougeL")},
+        })
+        del model
+
+    base = rows[0]["mean_ms"]
+    print()
+    print(f"{'backend':<9} {'load(s)':>8} {'mean(ms)':>9} {'p50(ms)':>8} {'p95(ms)':>8} "
+          f"{'speedup':>8} {'R-1':>6} {'R-2':>6} {'R-L':>6}")
+    for r in rows:
+        print(f"{r['backend']:<9} {r['load_s']:>8.1f} {r['mean_ms']:>9.0f} {r['p50_ms']:>8.0f} "
+              f"{r['p95_ms']:>8.0f} {base / r['mean_ms']:>7.2f}x "
+              f"{r['rouge1']:>6.3f} {r['rouge2']:>6.3f} {r['rougeL']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
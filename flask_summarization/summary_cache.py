@@ -0,0 +1,91 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+# =====================================================
+# 요약 결과 캐시 (디스크, 크기 제한 LRU)
+# -----------------------------------------------------
+# key = sha256(파일 바이트) + 모델 이름 + summary_type + generate 파라미터
+# 같은 PDF를 같은 옵션으로 다시 올리면 텍스트 추출/generate 없이 바로 응답
+# =====================================================
+CACHE_DB_PATH = "summary_cache.db"
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+def make_key(file_hash: str, model_name: str, summary_type: str, params: dict) -> str:
+    raw = json.dumps([file_hash, model_name, summary_type, params], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    def __init__(self, path: str = CACHE_DB_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_summary_cache_access ON summary_cache(last_access)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> str | None:
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT summary FROM summary_cache WHERE key=?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE summary_cache SET last_access=? WHERE key=?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, summary: str) -> None:
+        size = len(summary.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, summary, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, summary, size, time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # 용량을 넘으면 가장 오래 안 쓴 것부터 삭제
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM summary_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM summary_cache ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM summary_cache WHERE key=?", (key,))
+            total -= size
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summary_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
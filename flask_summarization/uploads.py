@@ -0,0 +1,61 @@
+import hashlib
+import tempfile
+
+from flask import Request
+
+
+# =====================================================
+# 업로드를 디스크(UPLOAD_DIR)에 저장하지 않고 바로 처리
+# -----------------------------------------------------
+# - multipart 파싱 시 파일 내용이 곧바로 SpooledTemporaryFile로 들어간다
+#   (SPOOL_MEMORY_BYTES 까지는 메모리, 넘으면 익명 임시파일)
+# - 들어오는 동안 sha256도 같이 계산 → 캐시 조회에 다시 읽을 필요 없음
+# - 요청이 끝나면 Flask가 request.files를 닫으면서 임시파일도 자동 삭제
+# - MAX_UPLOAD_BYTES 를 넘는 요청은 읽기 전에 413으로 거절
+# (flask_sentiment_101, flask_summarization 에 같은 파일이 있음, 고칠 때 같이)
+# =====================================================
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class HashingSpooledFile(tempfile.SpooledTemporaryFile):
+    def __init__(self, max_size: int = SPOOL_MEMORY_BYTES):
+        super().__init__(max_size=max_size)
+        self._sha256 = hashlib.sha256()
+
+    def write(self, s):
+        self._sha256.update(s)
+        return super().write(s)
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+class SpooledUploadRequest(Request):
+    spool_memory_bytes = SPOOL_MEMORY_BYTES
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpooledFile(max_size=self.spool_memory_bytes)
+
+
+def use_spooled_uploads(app, max_upload_bytes: int = MAX_UPLOAD_BYTES) -> None:
+    app.request_class = SpooledUploadRequest
+    app.config["MAX_CONTENT_LENGTH"] = max_upload_bytes
+
+
+def hash_stream(stream, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    # 업로드 스트림을 조각조각 읽으며 해시 → 다 읽은 뒤 처음으로 되감아 둔다
+    h = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        h.update(chunk)
+    stream.seek(0)
+    return h.hexdigest()
+
+
+def upload_sha256(file) -> str:
+    # 스풀 파일이면 받으면서 계산해 둔 값, 아니면 한 번 읽어서 계산
+    stream = file.stream
+    if isinstance(stream, HashingSpooledFile):
+        return stream.hexdigest()
+    return hash_stream(stream)
@@ -0,0 +1,126 @@
+import json
+
+from constrained import LABELS, SCHEMA_FORMAT, ChatOllama, SentimentParseError
+from langchain_core.messages import HumanMessage, SystemMessage
+
+
+# =====================================================
+# 여러 문장을 프롬프트 하나로 분류
+# -----------------------------------------------------
+# 문장 N 개에 번호를 붙여 한 번에 보내고 [{"id": 1, "sentiment": ...}, ...] 를 받는다.
+# → 시스템 프롬프트 prefill 과 왕복 비용을 N 문장이 나눠 씀
+# - 응답 번호/개수를 검증하고, 빠졌거나 라벨이 아닌 항목만 골라서 다시 질의 (MAX_REQUERY 번까지)
+# - 그래도 남으면 SentimentParseError (조용히 채워 넣지 않음)
+# - num_predict 는 호출마다 그 묶음의 문장 수에 맞춤 (N 이 커도 응답이 잘리지 않게)
+# =====================================================
+BATCH_SIZE = 8
+MAX_REQUERY = 2
+TOKENS_PER_ITEM = 32   # {"id": 12, "sentiment": "negative"}, 한 항목 분량 (공백/토크나이저 차이 여유 포함)
+OVERHEAD_TOKENS = 16   # {"results": [ ... ]}
+
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "sentiment": {"type": "string", "enum": list(LABELS)},
+                },
+                "required": ["id", "sentiment"],
+            },
+        },
+    },
+    "required": ["results"],
+}
+
+BATCH_SYSTEM_PROMPT = (
+    "너는 문장의 감정을 분류하는 AI다.\n"
+    "번호가 붙은 문장들을 각각 positive 또는 negative 로 분류하라.\n"
+    "모든 번호에 대해 빠짐없이, 아래 JSON 형식으로만 응답하라.\n"
+    '{"results": [{"id": 1, "sentiment": "positive" | "negative"}, ...]}'
+)
+
+
+def make_batch_llm(model: str = "qwen2:7b", batch_size: int = BATCH_SIZE, **kwargs) -> ChatOllama:
+    return ChatOllama(
+        model=model,
+        temperature=0,
+        format=BATCH_SCHEMA if SCHEMA_FORMAT else "json",
+        num_predict=batch_num_predict(batch_size),
+        **kwargs,
+    )
+
+
+def batch_num_predict(n: int) -> int:
+    return TOKENS_PER_ITEM * n + OVERHEAD_TOKENS
+
+
+def with_num_predict(llm, n: int):
+    # 묶음 크기에 맞춰 생성 길이 조정 (bind 로 넘기면 langchain_ollama 는 options 가 아니라 최상위 인자로 보내서 무시/오류)
+    update = {"num_predict": batch_num_predict(n)}
+    if hasattr(llm, "model_copy"):
+        return llm.model_copy(update=update)
+    return llm.copy(update=update)
+
+
+def build_messages(texts: list[str]) -> list:
+    # 줄바꿈이 번호 구분을 깨지 않도록 문장 안의 줄바꿈은 공백으로
+    numbered = "\n".join(f"{i}. {' '.join(t.split())}" for i, t in enumerate(texts, start=1))
+    return [SystemMessage(content=BATCH_SYSTEM_PROMPT), HumanMessage(content=numbered)]
+
+
+def parse_batch(content, n: int) -> dict[int, str]:
+    """응답 → {번호(0부터): 라벨}, 형식이 맞는 항목만 (빠진 번호는 호출한 쪽에서 재질의)"""
+    text = getattr(content, "content", content)
+    try:
+        obj = json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return {}
+
+    items = obj.get("results") if isinstance(obj, dict) else obj
+    if not isinstance(items, list):
+        return {}
+
+    labels: dict[int, str] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        idx, label = item.get("id"), item.get("sentiment")
+        if isinstance(label, str):
+            label = label.strip().lower()
+        if isinstance(idx, int) and 1 <= idx <= n and label in LABELS and idx - 1 not in labels:
+            labels[idx - 1] = label
+    return labels
+
+
+def classify_batch(llm, texts: list[str], max_requery: int = MAX_REQUERY, stats: dict | None = None) -> list[str]:
+    results: list[str | None] = [None] * len(texts)
+    todo = list(range(len(texts)))
+
+    previous = None
+    for attempt in range(max_requery + 1):
+        if not todo:
+            break
+        # 남은 문장만 1번부터 다시 번호를 매겨 질의
+        # 직전과 똑같은 묶음이면 (temperature=0 / 캐시라 같은 답이 나오므로) 한 문장씩 나눠서
+        groups = [todo] if todo != previous else [[i] for i in todo]
+        previous = todo
+
+        for group in groups:
+            if stats is not None:
+                stats["calls"] = stats.get("calls", 0) + 1
+                if attempt:
+                    stats["requeried"] = stats.get("requeried", 0) + len(group)
+            sized = with_num_predict(llm, len(group))
+            labels = parse_batch(sized.invoke(build_messages([texts[i] for i in group])), len(group))
+            for pos, label in labels.items():
+                results[group[pos]] = label
+        todo = [i for i in todo if results[i] is None]
+
+    if todo:
+        raise SentimentParseError(f"{len(todo)}개 문장을 분류하지 못했습니다 (번호: {[i + 1 for i in todo]})")
+    return results
+
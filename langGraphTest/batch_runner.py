@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import importlib
+import contextlib
+from itertools import islice
+
+from tracing import TRACE_METRICS_PORT, trace_config, tracer
+
+
+# =====================================================
+# 비동기 배치 실행기
+# -----------------------------------------------------
+# multi_file.py / miti_file_lcel.py 의 컴파일된 그래프(app)를
+# 문서 하나씩 invoke 하는 대신 abatch 로 동시에 여러 개 실행한다.
+# - 동시에 돌아가는 그래프 수는 --concurrency (= max_concurrency) 로 제한
+# - 입력은 파일 또는 stdin (JSONL {"text": ...} 이나 한 줄에 한 문장), --window 개씩 읽어서 처리
+# - 결과는 NDJSON 으로 출력, 끝나면 docs/sec 출력
+#
+# Ollama 서버도 동시에 요청을 처리하도록 OLLAMA_NUM_PARALLEL 을 concurrency 이상으로 설정해야 효과가 있다.
+#
+#   python batch_runner.py reviews.jsonl --concurrency 8 -o result.ndjson
+#   cat reviews.txt | python batch_runner.py - --graph miti_file_lcel
+#   python batch_runner.py reviews.jsonl --prompt-batch 8   (8 문장을 프롬프트 하나로, batch_prompt.py)
+#   python batch_runner.py reviews.jsonl --checkpoint runs.db   (중단돼도 이어서 실행, checkpointing.py)
+#   TRACE_JSONL=trace.jsonl TRACE_METRICS_PORT=9100 python batch_runner.py reviews.jsonl   (노드별 시간, tracing.py)
+# =====================================================
+DEFAULT_GRAPH = "multi_file"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_WINDOW = 256
+
+
+def parse_line(line: str, field: str = "text"):
+    # {"text": "..."} 또는 그냥 텍스트 한 줄
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            return line
+        return str(obj.get(field, ""))
+    return line
+
+
+def iter_documents(lines, field: str = "text"):
+    for line in lines:
+        text = parse_line(line, field)
+        if text:
+            yield text
+
+
+def iter_keyed_documents(lines, source: str, field: str = "text", id_field: str = "id"):
+    # (문서 키, 텍스트): 키는 입력 파일 + JSONL 의 id 필드, 없으면 줄 번호 (내용이 같아도 다른 문서)
+    for lineno, line in enumerate(lines, start=1):
+        text = parse_line(line, field)
+        if not text:
+            continue
+        key = f"line={lineno}"
+        if line.lstrip().startswith("{"):
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                obj = None
+            if isinstance(obj, dict) and obj.get(id_field) is not None:
+                key = f"{id_field}={obj[id_field]}"
+        yield f"{source}#{key}", text
+
+
+def load_graph_module(module_name: str):
+    # 각 스크립트는 import 만 하면 그래프를 컴파일해 app 으로 노출한다 (__main__ 부분은 실행 안 됨)
+    return importlib.import_module(module_name)
+
+
+async def run_documents(app, documents, concurrency: int = DEFAULT_CONCURRENCY,
+                        window: int = DEFAULT_WINDOW, on_result=None) -> dict:
+    stats = {"docs": 0, "errors": 0, "sentiment": {}}
+    start = time.perf_counter()
+
+    it = iter(documents)
+    while True:
+        chunk = list(islice(it, window))
+        if not chunk:
+            break
+
+        states = [{"text": doc, "sentiment": ""} for doc in chunk]
+        # 문서마다 trace run id (입력 순번), max_concurrency 는 첫 config 값이 쓰임
+        configs = [{**trace_config(stats["docs"] + i), "max_concurrency": concurrency} for i in range(len(chunk))]
+        results = await app.abatch(states, config=configs, return_exceptions=True)
+
+        for doc, result in zip(chunk, results):
+            collect_result(stats, doc, result, on_result)
+        report_progress(stats, len(chunk), start)
+
+    return finish_stats(stats, start)
+
+
+async def run_documents_prompt_batched(batch_app, documents, prompt_batch: int,
+                                      concurrency: int = DEFAULT_CONCURRENCY,
+                                      window: int = DEFAULT_WINDOW, on_result=None) -> dict:
+    # 문장 prompt_batch 개를 프롬프트 하나로 묶어 배치 그래프(batch_app)로 실행 (batch_prompt.py)
+    stats = {"docs": 0, "errors": 0, "sentiment": {}}
+    start = time.perf_counter()
+
+    it = iter(documents)
+    while True:
+        chunk = list(islice(it, window))
+        if not chunk:
+            break
+
+        groups = [chunk[i:i + prompt_batch] for i in range(0, len(chunk), prompt_batch)]
+        states = [{"texts": group, "sentiments": []} for group in groups]
+        # 묶음마다 trace run id (묶음 첫 문서의 입력 순번)
+        configs = [{**trace_config(stats["docs"] + i * prompt_batch), "max_concurrency": concurrency}
+                   for i in range(len(groups))]
+        results = await batch_app.abatch(states, config=configs, return_exceptions=True)
+
+        for group, result in zip(groups, results):
+            for i, doc in enumerate(group):
+                if isinstance(result, Exception):
+                    collect_result(stats, doc, result, on_result)
+                else:
+                    collect_result(stats, doc, {"sentiment": result["sentiments"][i]}, on_result)
+        report_progress(stats, len(chunk), start)
+
+    return finish_stats(stats, start)
+
+
+def collect_result(stats: dict, doc: str, result, on_result=None) -> None:
+    if isinstance(result, Exception):
+        stats["errors"] += 1
+        record = {"text": doc, "error": str(result)}
+    else:
+        sentiment = result.get("sentiment", "")
+        stats["sentiment"][sentiment] = stats["sentiment"].get(sentiment, 0) + 1
+        record = {"text": doc, "sentiment": sentiment}
+    if on_result:
+        on_result(record)
+
+
+def report_progress(stats: dict, n: int, start: float) -> None:
+    stats["docs"] += n
+    elapsed = time.perf_counter() - start
+    print(f"… {stats['docs']} docs, {stats['docs'] / elapsed:.1f} docs/sec", file=sys.stderr)
+
+
+def finish_stats(stats: dict, start: float) -> dict:
+    stats["elapsed_s"] = round(time.perf_counter() - start, 3)
+    stats["docs_per_sec"] = round(stats["docs"] / max(stats["elapsed_s"], 1e-9), 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LangGraph 감정 분석 그래프 비동기 배치 실행")
+    parser.add_argument("input", help="입력 파일 (JSONL 또는 한 줄에 한 문장), '-' 이면 stdin")
+    parser.add_argument("-o", "--output", default="-", help="출력 NDJSON 파일, 기본 stdout")
+    parser.add_argument("--graph", default=DEFAULT_GRAPH, help="app 을 가져올 모듈 (multi_file / miti_file_lcel)")
+    parser.add_argument("--field", default="text", help="JSONL 에서 텍스트가 들어 있는 키")
+    parser.add_argument("--id-field", default="id", help="--checkpoint 때 문서를 구분할 JSONL 키 (없으면 줄 번호)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--prompt-batch", type=int, default=0, metavar="N",
+                        help="문장 N 개를 프롬프트 하나로 분류 (모듈의 batch_app 사용)")
+    parser.add_argument("--checkpoint", metavar="DB", help="SQLite 체크포인트 파일 (주면 완료 문서는 건너뛰고 실패 문서는 이어서)")
+    args = parser.parse_args()
+
+    if args.prompt_batch > 1 and args.checkpoint:
+        parser.error("--prompt-batch 와 --checkpoint 는 같이 쓸 수 없습니다 (배치 그래프는 체크포인트 미지원)")
+
+    module = load_graph_module(args.graph)
+    if args.prompt_batch > 1 and not hasattr(module, "batch_app"):
+        parser.error(f"--graph {args.graph} 에는 batch_app 이 없어 --prompt-batch 를 쓸 수 없습니다")
+    if TRACE_METRICS_PORT:
+        tracer.start_metrics_server(TRACE_METRICS_PORT)
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    def write(record: dict):
+        dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    writer = getattr(module, "writer", None)
+    try:
+        # 노드들이 print 하는 로그가 NDJSON 출력에 섞이지 않도록 stderr 로
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                documents = iter_documents(src, args.field)
+                if args.prompt_batch > 1:
+                    runner = run_documents_prompt_batched(
+                        module.batch_app, documents, args.prompt_batch, args.concurrency, args.window,
+                        on_result=write
+                    )
+                elif args.checkpoint:
+                    from checkpointing import run_documents_checkpointed
+                    source = "stdin" if src is sys.stdin else os.path.abspath(args.input)
+                    runner = run_documents_checkpointed(
+                        module.graph, iter_keyed_documents(src, source, args.field, args.id_field), args.checkpoint, args.concurrency, args.window,
+                        on_result=write, writer=writer
+                    )
+                else:
+                    runner = run_documents(module.app, documents, args.concurrency, args.window, on_result=write)
+                stats = asyncio.run(runner)
+            finally:
+                # 버퍼에 남은 DB 저장 행 flush
+                if writer is not None:
+                    writer.close()
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    print(f"✅ {stats['docs']} docs in {stats['elapsed_s']:.1f}s "
+          f"({stats['docs_per_sec']:.1f} docs/sec), errors={stats['errors']}, "
+          f"skipped={stats.get('skipped', 0)}, resumed={stats.get('resumed', 0)}, {stats['sentiment']}",
+          file=sys.stderr)
+    print(tracer.summary_table(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+import time
+import argparse
+
+from batch_prompt import classify_batch, make_batch_llm
+from constrained import SentimentParseError
+
+
+# =====================================================
+# 프롬프트 하나에 넣는 문장 수(N)별 처리량 / 정확도 벤치마크
+# -----------------------------------------------------
+# 라벨이 붙은 JSONL ({"text": ..., "label": "positive" | "negative"}) 을
+# N 개씩 묶어 분류하고 N 마다
+# - docs/sec, LLM 호출 수, 재질의한 문장 수
+# - 정확도 (분류 실패한 문장은 오답으로 셈)
+# 를 비교한다. 캐시는 끄고 매번 실제로 Ollama 를 호출한다.
+#
+#   python bench_batch_prompt.py --sizes 1 4 8 16
+# =====================================================
+LABELLED_PATH = "bench/sentiment_labelled.jsonl"
+
+
+def load_labelled(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run(model: str, rows: list[dict], n: int) -> dict:
+    llm = make_batch_llm(model=model, batch_size=n, cache=False)
+    stats = {"calls": 0, "requeried": 0}
+    correct = failed = 0
+
+    start = time.perf_counter()
+    for i in range(0, len(rows), n):
+        group = rows[i:i + n]
+        try:
+            preds = classify_batch(llm, [r["text"] for r in group], stats=stats)
+        except SentimentParseError:
+            failed += len(group)
+            continue
+        correct += sum(p == r["label"] for p, r in zip(preds, group))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "n": n,
+        "docs_per_sec": len(rows) / elapsed,
+        "calls": stats["calls"],
+        "requeried": stats["requeried"],
+        "failed": failed,
+        "accuracy": correct / len(rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="멀티 문장 프롬프트 배치 벤치마크")
+    parser.add_argument("--model", default="qwen2:7b")
+    parser.add_argument("--data", default=LABELLED_PATH)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--warmup", action="store_true", help="측정 전에 모델을 한 번 호출해 로딩")
+    args = parser.parse_args()
+
+    rows = load_labelled(args.data)
+    if args.warmup:
+        run(args.model, rows[:1], 1)
+
+    results = []
+    for n in args.sizes:
+        print(f"▶ N={n} ...")
+        results.append(run(args.model, rows, n))
+
+    base = results[0]["docs_per_sec"]
+    print()
+    print(f"{'N':>3} {'docs/sec':>9} {'speedup':>8} {'calls':>6} {'requery':>8} {'failed':>7} {'accuracy':>9}")
+    for r in results:
+        print(f"{r['n']:>3} {r['docs_per_sec']:>9.2f} {r['docs_per_sec'] / base:>7.2f}x {r['calls']:>6} "
+              f"{r['requeried']:>8} {r['failed']:>7} {r['accuracy'] * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
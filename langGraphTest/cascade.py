@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+
+
+# =====================================================
+# 단계적(cascade) 감정 분류
+# -----------------------------------------------------
+# 싼 분류기부터 차례로 시도하고, 확신도가 threshold 미만일 때만 다음 단계로 넘긴다.
+#   1) keyword  : 긍정/부정 단어 규칙 (한쪽 단어만 있을 때만 확신)
+#   2) classifier: tabularisai/multilingual-sentiment-analysis (선택, transformers 필요)
+#   3) llm      : 마지막 단계, 각 그래프의 LLM 분류 함수 (qwen2:7b 등)
+# → 대부분의 문장은 7B 모델까지 가지 않는다.
+#
+# 환경변수
+#   CASCADE_THRESHOLD       : 이 확신도 이상이면 그 단계에서 확정 (기본 0.8)
+#   CASCADE_USE_CLASSIFIER  : 1 이면 2단계 분류기 사용 (기본 1, transformers 가 없으면 자동으로 건너뜀)
+# =====================================================
+CASCADE_THRESHOLD = float(os.environ.get("CASCADE_THRESHOLD", 0.8))
+USE_CLASSIFIER = os.environ.get("CASCADE_USE_CLASSIFIER", "1") == "1"
+CLASSIFIER_MODEL = "tabularisai/multilingual-sentiment-analysis"
+
+POSITIVE_WORDS = ("좋아", "좋다", "좋네", "좋은", "만족", "최고", "추천", "괜찮", "훌륭", "빠르", "친절", "감사")
+NEGATIVE_WORDS = ("별로", "불만", "최악", "느려", "느리", "실망", "안 씁", "환불", "불량", "고장", "짜증", "비싸")
+NEGATIONS = ("않", "없", "못", "아니")  # "좋지 않아요" 같은 부정문은 규칙으로 판단하지 않음
+
+# tabularisai 모델 라벨 → positive / negative (Neutral 은 확정하지 않고 다음 단계로)
+CLASSIFIER_LABELS = {
+    "Very Negative": "negative",
+    "Negative": "negative",
+    "Positive": "positive",
+    "Very Positive": "positive",
+}
+
+STAGES = ("keyword", "classifier", "llm")
+
+
+def keyword_sentiment(text: str) -> tuple[str, float]:
+    if any(w in text for w in NEGATIONS):
+        return "negative", 0.0
+    pos = sum(1 for w in POSITIVE_WORDS if w in text)
+    neg = sum(1 for w in NEGATIVE_WORDS if w in text)
+    if pos and not neg:
+        return "positive", min(0.75 + 0.1 * pos, 0.95)
+    if neg and not pos:
+        return "negative", min(0.75 + 0.1 * neg, 0.95)
+    # 단어가 없거나 양쪽이 섞이면 판단 보류
+    return "negative" if neg > pos else "positive", 0.0
+
+
+class SentimentCascade:
+    def __init__(self, llm_classify, threshold: float = CASCADE_THRESHOLD, use_classifier: bool = USE_CLASSIFIER):
+        self.llm_classify = llm_classify   # text -> "positive" | "negative"
+        self.threshold = threshold
+        self.use_classifier = use_classifier
+
+        self._classifier = None
+        self._classifier_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.counts = {stage: 0 for stage in STAGES}      # 그 단계에서 확정된 문장 수
+        self.seconds = {stage: 0.0 for stage in STAGES}   # 그 단계를 실행하는 데 쓴 시간 합
+
+    def _get_classifier(self):
+        with self._classifier_lock:
+            if self._classifier is None and self.use_classifier:
+                try:
+                    from transformers import pipeline
+                    self._classifier = pipeline("text-classification", model=CLASSIFIER_MODEL)
+                except Exception as e:  # transformers 미설치 / 모델 다운로드 실패
+                    print(f"⚠️ 분류기를 쓸 수 없어 keyword → llm 만 사용합니다: {e}")
+                    self.use_classifier = False
+            return self._classifier
+
+    def _classifier_sentiment(self, text: str) -> tuple[str, float]:
+        clf = self._get_classifier()
+        if clf is None:
+            return "negative", 0.0
+        pred = clf(text, truncation=True)[0]
+        label = CLASSIFIER_LABELS.get(pred["label"])
+        if label is None:
+            return "negative", 0.0
+        return label, float(pred["score"])
+
+    def _timed(self, stage: str, fn, text: str):
+        start = time.perf_counter()
+        result = fn(text)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.seconds[stage] += elapsed
+        return result
+
+    def _resolve(self, stage: str) -> None:
+        with self._lock:
+            self.counts[stage] += 1
+
+    def classify(self, text: str) -> tuple[str, str]:
+        """(sentiment, 확정된 단계) 반환"""
+        label, confidence = self._timed("keyword", keyword_sentiment, text)
+        if confidence >= self.threshold:
+            self._resolve("keyword")
+            return label, "keyword"
+
+        if self.use_classifier:
+            label, confidence = self._timed("classifier", self._classifier_sentiment, text)
+            if confidence >= self.threshold:
+                self._resolve("classifier")
+                return label, "classifier"
+
+        label = self._timed("llm", self.llm_classify, text)
+        self._resolve("llm")
+        return label, "llm"
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self.counts.values())
+            llm_calls = self.counts["llm"]
+            avg_llm = self.seconds["llm"] / llm_calls if llm_calls else 0.0
+            cheap_seconds = self.seconds["keyword"] + self.seconds["classifier"]
+            # 싼 단계에서 끝난 문장이 LLM 까지 갔다면 걸렸을 시간 - 싼 단계에 쓴 시간
+            saved = (total - llm_calls) * avg_llm - cheap_seconds
+            return {
+                "total": total,
+                "resolved": dict(self.counts),
+                "escalation_rate": round(llm_calls / total, 4) if total else 0.0,
+                "avg_llm_ms": round(avg_llm * 1000, 1),
+                "stage_seconds": {k: round(v, 3) for k, v in self.seconds.items()},
+                "latency_saved_s": round(saved, 3) if llm_calls else None,
+            }
+
+    def report(self) -> str:
+        s = self.stats()
+        if not s["total"]:
+            return "📊 cascade: 처리한 문장 없음"
+        resolved = ", ".join(f"{k}={v}" for k, v in s["resolved"].items())
+        saved = "n/a (LLM 호출 없음)" if s["latency_saved_s"] is None else f"약 {s['latency_saved_s']:.1f}s"
+        return (f"📊 cascade: {s['total']}건 ({resolved}) | "
+                f"LLM escalation {s['escalation_rate'] * 100:.1f}% | 절약한 시간 {saved}")
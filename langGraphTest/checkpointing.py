@@ -0,0 +1,84 @@
+import time
+import asyncio
+import hashlib
+from itertools import islice
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from batch_runner import DEFAULT_CONCURRENCY, DEFAULT_WINDOW, collect_result, finish_stats, report_progress
+
+
+# =====================================================
+# 체크포인트로 이어서 실행하기
+# -----------------------------------------------------
+# 그래프를 SQLite 체크포인터(AsyncSqliteSaver)와 함께 컴파일하고,
+# 문서마다 thread_id = 문서 키(입력 파일 + id 필드 또는 줄 번호) 해시 로 실행한다.
+# (내용으로 키를 만들면 같은 문장이 여러 번 나올 때 두 번째부터 건너뛰어 버림)
+# → 노드가 끝날 때마다 그 문서의 진행 상태가 DB 에 남는다.
+# 저장 노드가 버퍼에만 넣고 끝나면 행이 DB 에 들어가기 전에 "완료" 로 기록되므로,
+# writer 를 넘기면 durable 로 바꿔서 commit 이 끝나야 저장 노드가 완료되게 한다.
+#
+# 다시 실행하면 문서별로
+# - 끝까지 처리된 문서 : 건너뜀 (저장된 결과만 출력)
+# - 중간에 실패한 문서 : ainvoke(None) 으로 실패한 노드부터 재개 (analyze 를 다시 돌리지 않음)
+# - 처음 보는 문서     : 처음부터 실행
+#
+#   python batch_runner.py reviews.jsonl --checkpoint runs.db
+# =====================================================
+DEFAULT_CHECKPOINT_DB = "checkpoints.db"
+
+
+def document_thread_id(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+async def run_one(app, key: str, doc: str, sem: asyncio.Semaphore, stats: dict):
+    thread_id = document_thread_id(key)
+    config = {"configurable": {"thread_id": thread_id}, "metadata": {"trace_run": thread_id[:16]}}
+    async with sem:
+        snapshot = await app.aget_state(config)
+        if snapshot.values and not snapshot.next:
+            stats["skipped"] += 1
+            return snapshot.values
+        try:
+            if snapshot.next:
+                stats["resumed"] += 1
+                return await app.ainvoke(None, config)
+            return await app.ainvoke({"text": doc, "sentiment": ""}, config)
+        except Exception as e:
+            return e
+
+
+async def run_documents_checkpointed(graph, documents, db_path: str = DEFAULT_CHECKPOINT_DB,
+                                     concurrency: int = DEFAULT_CONCURRENCY,
+                                     window: int = DEFAULT_WINDOW, on_result=None, writer=None) -> dict:
+    """
+    graph: 컴파일 전 StateGraph (각 스크립트의 graph)
+    documents: (문서 키, 텍스트) 목록 (batch_runner.iter_keyed_documents)
+    writer: 그 스크립트의 SentimentLogWriter
+    """
+    if writer is not None:
+        writer.durable = True
+    stats = {"docs": 0, "errors": 0, "skipped": 0, "resumed": 0, "sentiment": {}}
+    start = time.perf_counter()
+    sem = asyncio.Semaphore(concurrency)
+
+    async with AsyncSqliteSaver.from_conn_string(db_path) as saver:
+        app = graph.compile(checkpointer=saver)
+
+        it = iter(documents)
+        while True:
+            chunk = list(islice(it, window))
+            if not chunk:
+                break
+
+            # 같은 키(= 같은 thread)가 동시에 두 번 돌지 않도록 window 안에서 키 중복만 제거
+            unique = dict(chunk)
+            results = await asyncio.gather(*(run_one(app, key, doc, sem, stats) for key, doc in unique.items()))
+            by_key = dict(zip(unique, results))
+
+            for key, doc in chunk:
+                collect_result(stats, doc, by_key[key], on_result)
+            report_progress(stats, len(chunk), start)
+
+    return finish_stats(stats, start)
@@ -0,0 +1,66 @@
+import json
+
+try:
+    # format 에 JSON schema 를 그대로 넘길 수 있는 공식 패키지
+    from langchain_ollama import ChatOllama
+    SCHEMA_FORMAT = True
+except ImportError:
+    # 구버전 langchain_community 는 format="json" 만 지원 → 스키마는 프롬프트로만 안내
+    from langchain_community.chat_models import ChatOllama
+    SCHEMA_FORMAT = False
+
+
+# =====================================================
+# 라벨 집합으로 제한한 감정 분류 출력
+# -----------------------------------------------------
+# Ollama 의 structured output(format=JSON schema)으로 디코딩 자체를
+# {"sentiment": "positive" | "negative"} 모양으로 제한하고, num_predict 로 생성 길이를 몇 토큰으로 자른다.
+# → 설명 문장에 토큰을 쓰지 않고, 파싱 실패 시 "negative" 로 조용히 바꾸던 처리를 없앤다.
+#    (그래도 라벨이 아니면 SentimentParseError 로 실패를 드러냄, 재시도 없음)
+# =====================================================
+LABELS = ("positive", "negative")
+NUM_PREDICT = 12   # {"sentiment": "negative"} 가 들어갈 만큼만
+
+SENTIMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment": {"type": "string", "enum": list(LABELS)},
+    },
+    "required": ["sentiment"],
+}
+
+SYSTEM_PROMPT = (
+    "너는 문장의 감정을 분류하는 AI다.\n"
+    "반드시 아래 JSON 형식으로만 응답하라.\n"
+    '{"sentiment": "positive" | "negative"}'
+)
+
+
+class SentimentParseError(ValueError):
+    """모델 출력이 라벨 집합에 맞지 않음"""
+
+
+def make_constrained_llm(model: str = "qwen2:7b", **kwargs) -> ChatOllama:
+    return ChatOllama(
+        model=model,
+        temperature=0,
+        format=SENTIMENT_SCHEMA if SCHEMA_FORMAT else "json",
+        num_predict=NUM_PREDICT,
+        **kwargs,
+    )
+
+
+def parse_sentiment(content) -> str:
+    # AIMessage 또는 문자열 → "positive" / "negative", 아니면 예외
+    text = getattr(content, "content", content)
+    try:
+        obj = json.loads(text)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise SentimentParseError(f"JSON 이 아닌 출력: {text!r}") from e
+
+    label = obj.get("sentiment") if isinstance(obj, dict) else None
+    if isinstance(label, str):
+        label = label.strip().lower()
+    if label not in LABELS:
+        raise SentimentParseError(f"라벨이 아닌 출력: {text!r}")
+    return label
@@ -0,0 +1,123 @@
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+
+# =====================================================
+# LLM 응답 캐시 (SQLite) + 녹화/재생
+# -----------------------------------------------------
+# temperature=0 이면 같은 입력에 같은 답이 나오므로, 한 번 받은 답은 저장해 두고 바로 돌려준다.
+# key = (llm_string: 모델 이름/temperature 등 설정, 정규화한 메시지 목록)
+#
+# 사용: ChatOllama(model=..., temperature=0, cache=get_llm_cache())
+#       → llm.invoke(...) 든 LCEL chain 이든 이 llm 을 거치는 호출은 모두 캐시됨
+#
+# 환경변수 LLM_CACHE_MODE
+#   off       : 캐시 사용 안 함
+#   readwrite : 있으면 캐시, 없으면 LLM 호출 후 저장 (기본)
+#   record    : 항상 LLM 을 호출하고 결과로 캐시를 덮어씀 (녹화)
+#   replay    : 캐시에서만 읽음, 없으면 LLMCacheMiss (Ollama 없이 테스트/벤치마크)
+# LLM_CACHE_DB : SQLite 파일 경로 (기본 llm_cache.db)
+# =====================================================
+CACHE_MODES = ("off", "readwrite", "record", "replay")
+LLM_CACHE_MODE = os.environ.get("LLM_CACHE_MODE", "readwrite")
+LLM_CACHE_DB = os.environ.get("LLM_CACHE_DB", "llm_cache.db")
+
+_SPACES = re.compile(r"\s+")
+
+
+class LLMCacheMiss(KeyError):
+    """replay 모드에서 녹화되지 않은 호출"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    # 직렬화된 메시지 목록에서 유니코드 표기/공백 차이만 무시
+    return _SPACES.sub(" ", unicodedata.normalize("NFKC", prompt)).strip()
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    raw = llm_string + "\x00" + normalize_prompt(prompt)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    def __init__(self, db_path: str = LLM_CACHE_DB, mode: str = LLM_CACHE_MODE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"지원하지 않는 캐시 모드: {mode} (가능: {', '.join(CACHE_MODES)})")
+        self.db_path = db_path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    llm_string TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    response TEXT NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 그래프 노드가 여러 스레드에서 돌기 때문에 호출마다 연결
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.mode == "record":
+            return None  # 녹화 모드: 항상 실제 LLM 호출
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (cache_key(prompt, llm_string),)
+            ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if row is None:
+            if self.mode == "replay":
+                raise LLMCacheMiss(f"녹화되지 않은 LLM 호출입니다: {normalize_prompt(prompt)[:200]}")
+            return None
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode == "replay":
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, llm_string, prompt, response) VALUES (?, ?, ?, ?)",
+                (cache_key(prompt, llm_string), llm_string, prompt, dumps(return_val)),
+            )
+
+    def clear(self, **kwargs) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def get_llm_cache(mode: str = LLM_CACHE_MODE, db_path: str = LLM_CACHE_DB):
+    """ChatOllama(cache=...) 에 넘길 값 (off 면 False → 전역 캐시도 사용 안 함)"""
+    if mode == "off":
+        return False
+    return SQLiteLLMCache(db_path, mode)
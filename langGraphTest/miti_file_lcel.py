@@ -1,11 +1,14 @@
+import asyncio
 from typing import TypedDict, List
 from langgraph.graph import StateGraph, END
 
-from langchain_community.chat_models import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 
-import pymysql
+from batch_runner import run_documents
+from constrained import SYSTEM_PROMPT, make_constrained_llm, parse_sentiment
+from llm_cache import get_llm_cache
+from mysql_writer import make_writer
+from tracing import traced, tracer
 
 
 # =====================================================
@@ -19,6 +22,9 @@ MYSQL_CONFIG = {
     "charset": "utf8mb4"
 }
 
+# 커넥션 풀 + 버퍼에 모았다가 executemany (SENTIMENT_LOG_DB 를 주면 SQLite)
+writer = make_writer(MYSQL_CONFIG)
+
 # =====================================================
 # State 정의
 # =====================================================
@@ -30,9 +36,14 @@ class MyState(TypedDict):
 # =====================================================
 # Ollama LLM
 # =====================================================
-llm = ChatOllama(
+# 응답 캐시 (SQLite, off / readwrite / record / replay)
+llm_cache = get_llm_cache()
+
+# 출력은 {"sentiment": "positive" | "negative"} JSON 으로 제한 (constrained.py)
+llm = make_constrained_llm(
     model="qwen2:7b",
-    temperature=0
+    cache=llm_cache,   # 같은 입력은 Ollama 를 다시 부르지 않음 (LLM_CACHE_MODE)
+    callbacks=[tracer.callback]   # 노드별 토큰 수 집계
 )
 
 
@@ -40,30 +51,20 @@ llm = ChatOllama(
 # LCEL Chain 정의
 # =====================================================
 prompt = ChatPromptTemplate.from_messages([
-    ("system",
-     "너는 문장의 감정을 분류하는 AI다.\n"
-     "반드시 아래 JSON 형식으로만 응답하라.\n"
-     "{ \"sentiment\": \"positive\" | \"negative\" }"
-    ),
+    # 프롬프트 템플릿 변수로 읽히지 않도록 JSON 중괄호는 이스케이프
+    ("system", SYSTEM_PROMPT.replace("{", "{{").replace("}", "}}")),
     ("human", "{text}")
 ])
 
-parser = JsonOutputParser()
-
-sentiment_chain = prompt | llm | parser
+# JsonOutputParser 대신 라벨 검증까지 하는 파서 (틀리면 SentimentParseError)
+sentiment_chain = prompt | llm | parse_sentiment
 
 
 # =====================================================
 # LangGraph Node (LCEL 사용)
 # =====================================================
 def analyze_sentiment(state: MyState) -> MyState:
-    result = sentiment_chain.invoke({"text": state["text"]})
-
-    sentiment = result.get("sentiment", "negative")
-    if sentiment not in ("positive", "negative"):
-        sentiment = "negative"
-
-    state["sentiment"] = sentiment
+    state["sentiment"] = sentiment_chain.invoke({"text": state["text"]})
     return state
 
 
@@ -84,20 +85,9 @@ def negative_node(state: MyState) -> MyState:
 # MySQL 저장 Node
 # =====================================================
 def save_to_mysql(state: MyState) -> MyState:
-    conn = pymysql.connect(**MYSQL_CONFIG)
-    cursor = conn.cursor()
-
-    sql = """
-        INSERT INTO sentiment_log (text, sentiment)
-        VALUES (%s, %s)
-    """
-    cursor.execute(sql, (state["text"], state["sentiment"]))
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-    print("💾 DB 저장 완료")
+    # 버퍼에만 넣고 바로 리턴, 실제 INSERT 는 batch 크기/시간 기준으로 모아서
+    # (체크포인트 실행이면 writer.durable 이라 commit 까지 끝나야 이 노드가 완료로 기록됨)
+    writer.save(state["text"], state["sentiment"])
     return state
 
 
@@ -113,10 +103,10 @@ def route_by_sentiment(state: MyState) -> str:
 # =====================================================
 graph = StateGraph(MyState)
 
-graph.add_node("analyze", analyze_sentiment)
-graph.add_node("positive", positive_node)
-graph.add_node("negative", negative_node)
-graph.add_node("save", save_to_mysql)
+graph.add_node("analyze", traced("analyze")(analyze_sentiment))
+graph.add_node("positive", traced("positive")(positive_node))
+graph.add_node("negative", traced("negative")(negative_node))
+graph.add_node("save", traced("save")(save_to_mysql))
 
 graph.set_entry_point("analyze")
 
@@ -149,12 +139,12 @@ if __name__ == "__main__":
 
     print("📄 멀티 문서 처리 시작\n")
 
-    for doc in documents:
-        app.invoke(
-            {
-                "text": doc,
-                "sentiment": ""
-            }
-        )
+    # 문서들을 동시에 처리 (대량 처리는 batch_runner.py 로 파일/stdin 입력)
+    stats = asyncio.run(run_documents(app, documents))
+    writer.close()
+    if llm_cache:
+        print(f"📊 LLM cache: {llm_cache.stats()}")
+
+    print(tracer.summary_table())
 
-    print("\n✅ 모든 문서 처리 완료")
+    print(f"\n✅ 모든 문서 처리 완료 ({stats['docs_per_sec']:.1f} docs/sec)")
@@ -1,10 +1,16 @@
+import asyncio
 from typing import TypedDict, List
 from langgraph.graph import StateGraph, END
 
-from langchain_community.chat_models import ChatOllama
 from langchain_core.messages import HumanMessage, SystemMessage
 
-import pymysql
+from batch_prompt import classify_batch, make_batch_llm
+from batch_runner import run_documents
+from cascade import SentimentCascade
+from constrained import SYSTEM_PROMPT, make_constrained_llm, parse_sentiment
+from llm_cache import get_llm_cache
+from mysql_writer import make_writer
+from tracing import traced, tracer
 
 
 # =====================================================
@@ -18,6 +24,9 @@ MYSQL_CONFIG = {
     "charset": "utf8mb4"
 }
 
+# 커넥션 풀 + 버퍼에 모았다가 executemany (SENTIMENT_LOG_DB 를 주면 SQLite)
+writer = make_writer(MYSQL_CONFIG)
+
 
 # =====================================================
 # State 정의
@@ -30,35 +39,36 @@ class MyState(TypedDict):
 # =====================================================
 # Ollama 설정
 # =====================================================
-llm = ChatOllama(
+# 응답 캐시 (SQLite, off / readwrite / record / replay)
+llm_cache = get_llm_cache()
+
+# 출력은 {"sentiment": "positive" | "negative"} JSON 으로 제한 (constrained.py)
+llm = make_constrained_llm(
     model="qwen2:7b",   # llama3, mistral 등 가능
-    temperature=0
+    cache=llm_cache,   # 같은 입력은 Ollama 를 다시 부르지 않음 (LLM_CACHE_MODE)
+    callbacks=[tracer.callback]   # 노드별 토큰 수 집계
 )
 
 
 # =====================================================
 # 감정 분석 Node
 # =====================================================
-def analyze_sentiment(state: MyState) -> MyState:
+def llm_sentiment(text: str) -> str:
     messages = [
-        SystemMessage(
-            content=(
-                "너는 문장의 감정을 분류하는 AI다.\n"
-                "반드시 아래 두 단어 중 하나만 출력하라.\n"
-                "- positive\n"
-                "- negative\n"
-                "설명은 절대 하지 마라."
-            )
-        ),
-        HumanMessage(content=state["text"])
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=text)
     ]
 
-    result = llm.invoke(messages).content.strip().lower()
+    # 라벨이 아니면 "negative" 로 바꾸지 않고 SentimentParseError (조용한 오분류 방지)
+    return parse_sentiment(llm.invoke(messages))
+
 
-    if result not in ("positive", "negative"):
-        result = "negative"
+# 키워드 → 분류기 → LLM 순서로, 확신이 없을 때만 LLM 호출
+cascade = SentimentCascade(llm_sentiment)
 
-    state["sentiment"] = result
+
+def analyze_sentiment(state: MyState) -> MyState:
+    state["sentiment"], _ = cascade.classify(state["text"])
     return state
 
 
@@ -79,20 +89,9 @@ def negative_node(state: MyState) -> MyState:
 # MySQL 저장 Node
 # =====================================================
 def save_to_mysql(state: MyState) -> MyState:
-    conn = pymysql.connect(**MYSQL_CONFIG)
-    cursor = conn.cursor()
-
-    sql = """
-        INSERT INTO sentiment_log (text, sentiment)
-        VALUES (%s, %s)
-    """
-    cursor.execute(sql, (state["text"], state["sentiment"]))
-
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-    print("💾 DB 저장 완료")
+    # 버퍼에만 넣고 바로 리턴, 실제 INSERT 는 batch 크기/시간 기준으로 모아서
+    # (체크포인트 실행이면 writer.durable 이라 commit 까지 끝나야 이 노드가 완료로 기록됨)
+    writer.save(state["text"], state["sentiment"])
     return state
 
 
@@ -108,10 +107,10 @@ def route_by_sentiment(state: MyState) -> str:
 # =====================================================
 graph = StateGraph(MyState)
 
-graph.add_node("analyze", analyze_sentiment)
-graph.add_node("positive", positive_node)
-graph.add_node("negative", negative_node)
-graph.add_node("save", save_to_mysql)
+graph.add_node("analyze", traced("analyze")(analyze_sentiment))
+graph.add_node("positive", traced("positive")(positive_node))
+graph.add_node("negative", traced("negative")(negative_node))
+graph.add_node("save", traced("save")(save_to_mysql))
 
 graph.set_entry_point("analyze")
 
@@ -131,6 +130,46 @@ graph.add_edge("save", END)
 app = graph.compile()
 
 
+# =====================================================
+# 배치 그래프: 문장 여러 개를 프롬프트 하나로 분류 (batch_prompt.py)
+# =====================================================
+class BatchState(TypedDict):
+    texts: List[str]
+    sentiments: List[str]
+
+
+batch_llm = make_batch_llm(
+    model="qwen2:7b",
+    cache=llm_cache,
+    callbacks=[tracer.callback]
+)
+
+
+def analyze_batch(state: BatchState) -> BatchState:
+    state["sentiments"] = classify_batch(batch_llm, state["texts"])
+    return state
+
+
+def save_batch(state: BatchState) -> BatchState:
+    # 단건 그래프와 같이 negative 만 저장
+    for text, sentiment in zip(state["texts"], state["sentiments"]):
+        if sentiment == "negative":
+            writer.save(text, sentiment)
+    return state
+
+
+batch_graph = StateGraph(BatchState)
+
+batch_graph.add_node("analyze_batch", traced("analyze_batch")(analyze_batch))
+batch_graph.add_node("save_batch", traced("save_batch")(save_batch))
+
+batch_graph.set_entry_point("analyze_batch")
+batch_graph.add_edge("analyze_batch", "save_batch")
+batch_graph.add_edge("save_batch", END)
+
+batch_app = batch_graph.compile()
+
+
 # =====================================================
 # 멀티 문서 처리
 # =====================================================
@@ -144,12 +183,13 @@ if __name__ == "__main__":
 
     print("📄 멀티 문서 처리 시작\n")
 
-    for doc in documents:
-        app.invoke(
-            {
-                "text": doc,
-                "sentiment": ""
-            }
-        )
+    # 문서들을 동시에 처리 (대량 처리는 batch_runner.py 로 파일/stdin 입력)
+    stats = asyncio.run(run_documents(app, documents))
+    writer.close()
+    if llm_cache:
+        print(f"📊 LLM cache: {llm_cache.stats()}")
+    print(cascade.report())
+
+    print(tracer.summary_table())
 
-    print("\n✅ 모든 문서 처리 완료")
+    print(f"\n✅ 모든 문서 처리 완료 ({stats['docs_per_sec']:.1f} docs/sec)")
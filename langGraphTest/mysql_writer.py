@@ -0,0 +1,227 @@
+import os
+import time
+import queue
+import atexit
+import threading
+
+
+# =====================================================
+# sentiment_log 배치 저장기
+# -----------------------------------------------------
+# 문서마다 connect → INSERT 1건 → commit → close 하던 것을
+# - 커넥션 풀 (pool_size 개를 만들어 두고 돌려 씀)
+# - 버퍼에 모았다가 batch_size 개가 차거나 flush_interval 초가 지나면 executemany + commit 1번
+# - 그래프 실행이 끝나면 close() 로 남은 행 flush (끝내 못 쓴 행 수는 출력)
+# - durable=True 면 (체크포인트 실행) 버퍼 없이 save() 마다 바로 commit, 실패는 노드 예외로
+# 으로 바꾼다.
+#
+# DB-API 모듈이면 무엇이든 사용 가능 (pymysql, sqlite3 ...)
+# 환경변수 SENTIMENT_LOG_DB=경로 를 주면 MySQL 대신 로컬 SQLite 에 저장 (테스트/오프라인용)
+# =====================================================
+BATCH_SIZE = int(os.environ.get("SENTIMENT_LOG_BATCH", 100))
+FLUSH_INTERVAL = float(os.environ.get("SENTIMENT_LOG_FLUSH_SECONDS", 1.0))
+POOL_SIZE = int(os.environ.get("SENTIMENT_LOG_POOL", 4))
+SQLITE_PATH = os.environ.get("SENTIMENT_LOG_DB")
+
+_PLACEHOLDERS = {
+    "qmark": "?",
+    "format": "%s",
+    "pyformat": "%s",
+}
+
+
+class ConnectionPool:
+    def __init__(self, connect, size: int = POOL_SIZE):
+        self._connect = connect
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def release(self, conn, broken: bool = False) -> None:
+        if broken:
+            # 에러 난 커넥션은 버리고 다음에 새로 연결
+            with self._lock:
+                self._all.remove(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class SentimentLogWriter:
+    def __init__(self, connect, paramstyle: str = "pyformat", batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, pool_size: int = POOL_SIZE):
+        if paramstyle not in _PLACEHOLDERS:
+            raise ValueError(f"지원하지 않는 paramstyle: {paramstyle}")
+        ph = _PLACEHOLDERS[paramstyle]
+        self.sql = f"INSERT INTO sentiment_log (text, sentiment) VALUES ({ph}, {ph})"
+
+        self.pool = ConnectionPool(connect, pool_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durable = False                    # True 면 save() 가 commit 까지 끝내고 리턴
+
+        self._rows: list[tuple[str, str]] = []
+        self._oldest = 0.0                      # 버퍼의 가장 오래된 행이 들어온 시각
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()     # executemany 순서 보장
+        self._closed = threading.Event()
+
+        self.written = 0
+        self.flushes = 0
+
+        # 시간 기준 flush: 행이 적게 들어와도 flush_interval 안에는 DB 에 반영
+        self._timer = threading.Thread(target=self._flush_loop, name="sentiment-log-writer", daemon=True)
+        self._timer.start()
+        atexit.register(self.close)
+
+    def save(self, text: str, sentiment: str) -> None:
+        # 저장 노드용: 평소에는 버퍼에 넣고, durable 이면 commit 될 때까지 기다림
+        if self.durable:
+            self.write_now([(text, sentiment)])
+        else:
+            self.add(text, sentiment)
+
+    def write_now(self, rows: list[tuple[str, str]]) -> int:
+        # 버퍼를 거치지 않고 바로 executemany + commit, 실패하면 그대로 예외 (행은 버퍼에 남기지 않음)
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(self.sql, rows)
+            conn.commit()
+            cursor.close()
+        except Exception:
+            self.pool.release(conn, broken=True)
+            raise
+        self.pool.release(conn)
+
+        with self._lock:
+            self.written += len(rows)
+            self.flushes += 1
+        return len(rows)
+
+    def add(self, text: str, sentiment: str) -> None:
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append((text, sentiment))
+            full = len(self._rows) >= self.batch_size
+        if full:
+            # 노드 안에서 불리므로 예외를 올리지 않음, 실패한 행은 버퍼에 남아 타이머 / close() 가 다시 시도
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ sentiment_log flush 실패 (다음에 재시도): {e}")
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            conn = self.pool.acquire()
+            try:
+                cursor = conn.cursor()
+                cursor.executemany(self.sql, rows)
+                conn.commit()
+                cursor.close()
+            except Exception:
+                # 실패한 행은 버퍼 앞에 되돌려서 다음 flush 때 다시 시도
+                with self._lock:
+                    self._rows[:0] = rows
+                self.pool.release(conn, broken=True)
+                raise
+            self.pool.release(conn)
+
+            # 카운터는 write_now() 와 같이 _lock 으로 갱신
+            with self._lock:
+                self.written += len(rows)
+                self.flushes += 1
+            return len(rows)
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval / 2):
+            with self._lock:
+                due = self._rows and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"⚠️ sentiment_log flush 실패 (다음에 재시도): {e}")
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._timer.join()
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ sentiment_log 마지막 flush 실패: {e}")
+        finally:
+            self.pool.close()
+        with self._lock:
+            written, flushes, unwritten = self.written, self.flushes, len(self._rows)
+        print(f"💾 DB 저장 완료: {written}건 ({flushes}회 flush)")
+        if unwritten:
+            print(f"❌ DB 저장 실패: {unwritten}건은 저장하지 못했습니다")
+
+
+def sqlite_writer(path: str, **kwargs) -> SentimentLogWriter:
+    import sqlite3
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                sentiment TEXT NOT NULL
+            )
+        """)
+    # 커넥션을 풀에서 여러 스레드가 돌려 쓰므로 check_same_thread=False
+    return SentimentLogWriter(
+        lambda: sqlite3.connect(path, timeout=30, check_same_thread=False),
+        paramstyle=sqlite3.paramstyle,
+        **kwargs,
+    )
+
+
+def mysql_writer(config: dict, **kwargs) -> SentimentLogWriter:
+    import pymysql
+
+    return SentimentLogWriter(lambda: pymysql.connect(**config), paramstyle=pymysql.paramstyle, **kwargs)
+
+
+def make_writer(mysql_config: dict, **kwargs) -> SentimentLogWriter:
+    if SQLITE_PATH:
+        return sqlite_writer(SQLITE_PATH, **kwargs)
+    return mysql_writer(mysql_config, **kwargs)
@@ -1,9 +1,12 @@
 from typing import TypedDict
 from langgraph.graph import StateGraph, END
 
-from langchain_community.chat_models import ChatOllama
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from cascade import SentimentCascade
+from constrained import SYSTEM_PROMPT, SentimentParseError, make_constrained_llm, parse_sentiment
+from llm_cache import get_llm_cache
+
 
 # =====================================================
 # 1. State 정의
@@ -16,38 +19,36 @@ class MyState(TypedDict):
 # =====================================================
 # 2. Ollama LLM 설정
 # =====================================================
-llm = ChatOllama(
+# 응답 캐시 (SQLite, off / readwrite / record / replay)
+llm_cache = get_llm_cache()
+
+# 출력은 {"sentiment": "positive" | "negative"} JSON 으로 제한 (constrained.py)
+llm = make_constrained_llm(
     model="qwen2:7b",   # llama3, mistral 등으로 변경 가능
-    temperature=0
+    cache=llm_cache   # 같은 입력은 Ollama 를 다시 부르지 않음 (LLM_CACHE_MODE)
 )
 
 
 # =====================================================
 # 3. 감정 분석 Node (LLM 기반 조건 판단)
 # =====================================================
-def analyze_sentiment(state: MyState) -> MyState:
-    text = state["text"]
-
+def llm_sentiment(text: str) -> str:
     messages = [
-        SystemMessage(
-            content=(
-                "너는 문장의 감정을 분류하는 AI다.\n"
-                "반드시 아래 두 단어 중 하나만 출력하라.\n"
-                "- positive\n"
-                "- negative\n"
-                "설명이나 다른 문장은 절대 출력하지 마라."
-            )
-        ),
+        SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=text)
     ]
 
-    response = llm.invoke(messages).content.strip().lower()
+    # 라벨이 아니면 "negative" 로 바꾸지 않고 SentimentParseError (조용한 오분류 방지)
+    return parse_sentiment(llm.invoke(messages))
 
-    # 예외 처리 (환각 방지)
-    if response not in ("positive", "negative"):
-        response = "negative"
 
-    state["sentiment"] = response
+# 키워드 → 분류기 → LLM 순서로, 확신이 없을 때만 LLM 호출
+cascade = SentimentCascade(llm_sentiment)
+
+
+def analyze_sentiment(state: MyState) -> MyState:
+    state["sentiment"], stage = cascade.classify(state["text"])
+    print(f"🔎 판단 단계: {stage}")
     return state
 
 
@@ -109,15 +110,20 @@ if __name__ == "__main__":
             if not user_text:
                 continue
 
-            result = app.invoke(
-                {
-                    "text": user_text,
-                    "sentiment": ""
-                }
-            )
+            try:
+                result = app.invoke(
+                    {
+                        "text": user_text,
+                        "sentiment": ""
+                    }
+                )
+            except SentimentParseError as e:
+                print(f"⚠️ 분류 실패: {e}")
+                continue
 
             print("📦 최종 State:", result)
             print("-" * 40)
 
     except KeyboardInterrupt:
         print("\n👋 종료합니다.")
+        print(cascade.report())
@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import uuid
+import random
+import inspect
+import functools
+import threading
+import contextvars
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import ensure_config
+
+
+# =====================================================
+# 노드별 지연 시간 / 토큰 추적
+# -----------------------------------------------------
+# graph.add_node("analyze", traced("analyze")(analyze_sentiment)) 처럼 노드를 감싸면
+# - 노드 실행 시간 (histogram)
+# - 그 노드 안에서 호출된 LLM 의 입력/출력 토큰 수 (ChatOllama(callbacks=[tracer.callback]))
+# 를 모으고
+# - TRACE_JSONL 파일에 노드 실행 1건당 1줄 (run = 실행기가 문서마다 붙인 id → 문서별 trace)
+# - TRACE_METRICS_PORT 를 주면 http://localhost:<port>/metrics 에 Prometheus 텍스트
+# - 배치가 끝나면 tracer.summary_table() 로 노드별 요약 표
+# =====================================================
+TRACE_JSONL = os.environ.get("TRACE_JSONL")               # 없으면 파일로 남기지 않음
+TRACE_METRICS_PORT = int(os.environ.get("TRACE_METRICS_PORT", 0))  # 0 이면 서버 안 띄움
+
+# 초 단위 histogram 버킷 (키워드 규칙 ~ 7B LLM 까지)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SAMPLE_LIMIT = 4096   # p50 / p95 용으로 노드마다 들고 있는 지연 시간 표본 수 (reservoir sampling)
+
+# 이 프로세스의 배치 실행 구분 (같은 trace 파일에 여러 번 실행해도 run 이 겹치지 않게)
+RUN_PREFIX = uuid.uuid4().hex[:8]
+
+# 지금 실행 중인 노드 이름과 그 실행에서 쓴 토큰 [in, out]
+# (contextvar 라서 스레드로 돌든 코루틴으로 돌든 노드 실행마다 따로)
+_current_node: contextvars.ContextVar = contextvars.ContextVar("current_node", default=None)
+_node_tokens: contextvars.ContextVar = contextvars.ContextVar("node_tokens", default=None)
+
+
+def trace_config(index) -> dict:
+    # 실행기가 문서(배치 그래프면 묶음)마다 넘기는 config: 같은 내용의 문서라도 run 이 따로
+    return {"metadata": {"trace_run": f"{RUN_PREFIX}-{index}"}}
+
+
+def run_id_for() -> str:
+    # 지금 실행 중인 노드의 config metadata 에서 (문서 내용으로 만들면 같은 문장끼리 trace 가 섞임)
+    run = (ensure_config().get("metadata") or {}).get("trace_run")
+    if run:
+        return str(run)
+    # 실행기를 거치지 않은 단독 invoke 는 노드 실행마다 새 id
+    return uuid.uuid4().hex[:16]
+
+
+class NodeStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.samples: list[float] = []   # p50 / p95 계산용, 최대 SAMPLE_LIMIT 개
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if len(self.samples) < SAMPLE_LIMIT:
+            self.samples.append(seconds)
+        else:
+            # 지금까지의 모든 관측에서 고르게 뽑은 표본을 유지 (메모리는 고정)
+            i = random.randrange(self.count)
+            if i < SAMPLE_LIMIT:
+                self.samples[i] = seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    # LLM 호출이 끝날 때 토큰 수를 지금 실행 중인 노드에 더함
+    def __init__(self, tracer: "Tracer"):
+        self.tracer = tracer
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        tokens_in = tokens_out = 0
+        for gens in response.generations:
+            for gen in gens:
+                message = getattr(gen, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                meta = getattr(message, "response_metadata", None) or gen.generation_info or {}
+                tokens_in += usage.get("input_tokens") or meta.get("prompt_eval_count") or 0
+                tokens_out += usage.get("output_tokens") or meta.get("eval_count") or 0
+        self.tracer.add_tokens(_current_node.get(), tokens_in, tokens_out)
+
+
+class Tracer:
+    def __init__(self, jsonl_path: str | None = TRACE_JSONL):
+        self.jsonl_path = jsonl_path
+        self.nodes: dict[str, NodeStats] = {}
+        self.callback = TokenUsageCallback(self)
+        self._lock = threading.Lock()
+
+    def _node(self, name: str) -> NodeStats:
+        if name not in self.nodes:
+            self.nodes[name] = NodeStats()
+        return self.nodes[name]
+
+    def add_tokens(self, node: str | None, tokens_in: int, tokens_out: int) -> None:
+        if node is None:
+            return
+        with self._lock:
+            stats = self._node(node)
+            stats.tokens_in += tokens_in
+            stats.tokens_out += tokens_out
+        # 이번 노드 실행의 trace 줄에도 기록
+        tokens = _node_tokens.get()
+        if tokens is not None:
+            tokens[0] += tokens_in
+            tokens[1] += tokens_out
+
+    def record(self, node: str, run_id: str, start: float, seconds: float,
+               tokens: list[int], error: str | None = None) -> None:
+        with self._lock:
+            stats = self._node(node)
+            stats.observe(seconds)
+            if error:
+                stats.errors += 1
+            if self.jsonl_path:
+                line = {
+                    "ts": round(start, 3),
+                    "run": run_id,
+                    "node": node,
+                    "ms": round(seconds * 1000, 2),
+                    "tokens_in": tokens[0],
+                    "tokens_out": tokens[1],
+                }
+                if error:
+                    line["error"] = error
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    # --------------------------------
+    # Node wrapper
+    # --------------------------------
+    def traced(self, name: str):
+        def decorator(fn):
+            def _begin(state):
+                tokens = [0, 0]
+                ctx = (_current_node.set(name), _node_tokens.set(tokens), tokens)
+                return ctx, time.time(), time.perf_counter()
+
+            def _end(state, ctx, wall, t0, error=None):
+                seconds = time.perf_counter() - t0
+                node_token, tokens_token, tokens = ctx
+                _node_tokens.reset(tokens_token)
+                _current_node.reset(node_token)
+                self.record(name, run_id_for(), wall, seconds, tokens, error)
+
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(state):
+                    ctx, wall, t0 = _begin(state)
+                    try:
+                        result = await fn(state)
+                    except Exception as e:
+                        _end(state, ctx, wall, t0, error=str(e))
+                        raise
+                    _end(state, ctx, wall, t0)
+                    return result
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(state):
+                ctx, wall, t0 = _begin(state)
+                try:
+                    result = fn(state)
+                except Exception as e:
+                    _end(state, ctx, wall, t0, error=str(e))
+                    raise
+                _end(state, ctx, wall, t0)
+                return result
+            return wrapper
+        return decorator
+
+    # --------------------------------
+    # Export
+    # --------------------------------
+    def prometheus_text(self) -> str:
+        lines = [
+            "# HELP langgraph_node_seconds LangGraph node latency",
+            "# TYPE langgraph_node_seconds histogram",
+        ]
+        with self._lock:
+            for node, s in sorted(self.nodes.items()):
+                for bound, count in zip(LATENCY_BUCKETS, s.bucket_counts):
+                    lines.append(f'langgraph_node_seconds_bucket{{node="{node}",le="{bound}"}} {count}')
+                lines.append(f'langgraph_node_seconds_bucket{{node="{node}",le="+Inf"}} {s.count}')
+                lines.append(f'langgraph_node_seconds_sum{{node="{node}"}} {s.total:.6f}')
+                lines.append(f'langgraph_node_seconds_count{{node="{node}"}} {s.count}')
+            lines.append("# TYPE langgraph_node_errors_total counter")
+            for node, s in sorted(self.nodes.items()):
+                lines.append(f'langgraph_node_errors_total{{node="{node}"}} {s.errors}')
+            lines.append("# TYPE langgraph_node_tokens_total counter")
+            for node, s in sorted(self.nodes.items()):
+                lines.append(f'langgraph_node_tokens_total{{node="{node}",direction="in"}} {s.tokens_in}')
+                lines.append(f'langgraph_node_tokens_total{{node="{node}",direction="out"}} {s.tokens_out}')
+        return "\n".join(lines) + "\n"
+
+    def start_metrics_server(self, port: int = TRACE_METRICS_PORT):
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="trace-metrics", daemon=True).start()
+        print(f"📈 metrics: http://localhost:{port}/metrics")
+        return server
+
+    def summary_table(self) -> str:
+        with self._lock:
+            if not self.nodes:
+                return "📊 trace: 기록된 노드 없음"
+            wall = sum(s.total for s in self.nodes.values()) or 1e-9
+            rows = [f"{'node':<12} {'calls':>6} {'total(s)':>9} {'mean(ms)':>9} {'p50(ms)':>8} "
+                    f"{'p95(ms)':>8} {'share':>6} {'tok_in':>8} {'tok_out':>8} {'err':>4}"]
+            for node, s in sorted(self.nodes.items(), key=lambda kv: -kv[1].total):
+                mean = s.total / s.count if s.count else 0.0
+                rows.append(
+                    f"{node:<12} {s.count:>6} {s.total:>9.2f} {mean * 1000:>9.1f} "
+                    f"{s.percentile(0.5) * 1000:>8.1f} {s.percentile(0.95) * 1000:>8.1f} "
+                    f"{s.total / wall * 100:>5.1f}% {s.tokens_in:>8} {s.tokens_out:>8} {s.errors:>4}"
+                )
+        return "\n".join(rows)
+
+
+# 프로세스 공용 tracer (그래프 스크립트들이 같이 씀)
+tracer = Tracer()
+traced = tracer.traced
@@ -1,74 +1,26 @@
 import os
 import sys
-import torch
+from PyQt5.QtCore import QThreadPool, QTimer
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QFileDialog,
-    QVBoxLayout, QHBoxLayout, QTextEdit, QRadioButton, QMessageBox
+    QVBoxLayout, QHBoxLayout, QTextEdit, QRadioButton, QMessageBox,
+    QListWidget, QListWidgetItem, QProgressBar, QTabWidget
 )
-from pypdf import PdfReader
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
-# --------------------------------
-# Config
-# --------------------------------
-UPLOAD_DIR = "uploads"
-MODEL_NAME = "lcw99/t5-base-korean-text-summary"
-
-device = "cuda" if torch.cuda.is_available() else "cpu"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-# --------------------------------
-# Load model (ONCE)
-# --------------------------------
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
-model.to(device)
-model.eval()
-
-# --------------------------------
-# PDF → Text
-# --------------------------------
-def extract_text_from_pdf(pdf_path: str) -> str:
-    reader = PdfReader(pdf_path)
-    texts = []
-    for page in reader.pages:
-        t = page.extract_text()
-        if t:
-            texts.append(t.strip())
-    return "\n".join(texts)
+from folder_watch import FolderWatchPanel
+from summarizer import BACKEND, is_model_loaded
+from workers import ModelLoadTask, SummaryTask
 
 # --------------------------------
-# Summarization
+# Config
 # --------------------------------
-def summarize_text(text: str, summary_type: str) -> str:
-    if not text.strip():
-        return "요약할 텍스트가 없습니다."
-
-    if summary_type == "long":
-        max_len = 400
-        min_len = 150
-        beams = 4
-    else:
-        max_len = 200
-        min_len = 60
-        beams = 2
-
-    inputs = tokenizer(
-        text[:3000],
-        return_tensors="pt",
-        truncation=True
-    ).to(device)
-
-    with torch.no_grad():
-        output_ids = model.generate(
-            **inputs,
-            max_length=max_len,
-            min_length=min_len,
-            num_beams=beams,
-            early_stopping=True
-        )
-
-    return tokenizer.decode(output_ids[0], skip_special_tokens=True)
+STATUS_ICONS = {
+    "queued": "⏸ 대기",
+    "running": "⏳ 요약 중",
+    "done": "✅ 완료",
+    "failed": "❌ 실패",
+    "cancelled": "⏹ 취소",
+}
 
 # --------------------------------
 # PyQt UI
@@ -79,17 +31,32 @@ class PdfSummaryApp(QWidget):
         self.setWindowTitle("PDF 요약기 (transformers)")
         self.setGeometry(300, 200, 700, 600)
 
-        self.pdf_path = None
+        self.pdf_paths: list[str] = []
+        self.tasks: dict[str, SummaryTask] = {}     # path -> 대기/실행 중인 작업
+        self.items: dict[str, QListWidgetItem] = {}
+        self.summaries: dict[str, str] = {}
+
+        # 모델 로딩용 풀과 요약용 풀을 분리 (요약은 한 번에 하나씩 순서대로)
+        self.model_pool = QThreadPool(self)
+        self.summary_pool = QThreadPool(self)
+        self.summary_pool.setMaxThreadCount(1)
 
         # Widgets
-        self.label = QLabel("PDF 파일을 선택하세요")
+        self.label = QLabel("PDF 파일을 선택하세요 (여러 개 선택 가능)")
+        self.model_label = QLabel(f"모델 로딩 중... (backend: {BACKEND})")
         self.btn_select = QPushButton("📂 PDF 선택")
         self.btn_summary = QPushButton("📝 요약하기")
+        self.btn_cancel = QPushButton("⏹ 취소")
+        self.btn_cancel.setEnabled(False)
 
         self.radio_short = QRadioButton("짧게 요약")
         self.radio_long = QRadioButton("자세히 요약")
         self.radio_short.setChecked(True)
 
+        self.file_list = QListWidget()
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+
         self.text_result = QTextEdit()
         self.text_result.setReadOnly(True)
 
@@ -98,11 +65,18 @@ class PdfSummaryApp(QWidget):
         radio_layout.addWidget(self.radio_short)
         radio_layout.addWidget(self.radio_long)
 
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.btn_summary)
+        button_layout.addWidget(self.btn_cancel)
+
         layout = QVBoxLayout()
+        layout.addWidget(self.model_label)
         layout.addWidget(self.label)
         layout.addWidget(self.btn_select)
+        layout.addWidget(self.file_list)
         layout.addLayout(radio_layout)
-        layout.addWidget(self.btn_summary)
+        layout.addLayout(button_layout)
+        layout.addWidget(self.progress)
         layout.addWidget(self.text_result)
 
         self.setLayout(layout)
@@ -110,35 +84,159 @@ class PdfSummaryApp(QWidget):
         # Signals
         self.btn_select.clicked.connect(self.select_pdf)
         self.btn_summary.clicked.connect(self.run_summary)
+        self.btn_cancel.clicked.connect(self.cancel_all)
+        self.file_list.currentItemChanged.connect(self.show_selected)
+
+    # --------------------------------
+    # 모델 백그라운드 로딩 (창이 뜬 다음)
+    # --------------------------------
+    def start_model_loading(self):
+        if is_model_loaded():
+            self.on_model_loaded()
+            return
+        task = ModelLoadTask()
+        task.signals.loaded.connect(self.on_model_loaded)
+        task.signals.failed.connect(self.on_model_failed)
+        self.model_pool.start(task)
+
+    def on_model_loaded(self):
+        self.model_label.setText(f"모델 준비 완료 ✅ (backend: {BACKEND})")
 
+    def on_model_failed(self, error: str):
+        self.model_label.setText("모델 로딩 실패 ❌")
+        QMessageBox.critical(self, "오류", f"모델 로딩 실패: {error}")
+
+    # --------------------------------
+    # 파일 선택 / 큐
+    # --------------------------------
     def select_pdf(self):
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self, "PDF 선택", "", "PDF Files (*.pdf)"
         )
-        if file_path:
-            self.pdf_path = file_path
-            self.label.setText(f"선택된 파일: {os.path.basename(file_path)}")
+        if not file_paths:
+            return
+
+        for path in file_paths:
+            if path in self.items:
+                continue
+            self.pdf_paths.append(path)
+            item = QListWidgetItem()
+            self.items[path] = item
+            self.file_list.addItem(item)
+            self.set_status(path, "queued")
+        self.label.setText(f"선택된 파일: {len(self.pdf_paths)}개")
+
+    def set_status(self, path: str, status: str, extra: str = ""):
+        text = f"{STATUS_ICONS[status]}  {os.path.basename(path)}"
+        if extra:
+            text += f"  ({extra})"
+        self.items[path].setText(text)
 
     def run_summary(self):
-        if not self.pdf_path:
-            QMessageBox.warning(self, "경고", "PDF 파일을 먼저 선택하세요.")
+        pending = [
+            p for p in self.pdf_paths
+            if p not in self.tasks and p not in self.summaries
+        ]
+        if not pending:
+            QMessageBox.warning(self, "경고", "요약할 PDF 파일을 먼저 선택하세요.")
+            return
+
+        summary_type = "long" if self.radio_long.isChecked() else "short"
+        for path in pending:
+            task = SummaryTask(path, summary_type)
+            task.signals.started.connect(self.on_started)
+            task.signals.progress.connect(self.on_progress)
+            task.signals.finished.connect(self.on_finished)
+            task.signals.failed.connect(self.on_failed)
+            task.signals.cancelled.connect(self.on_cancelled)
+            self.tasks[path] = task
+            self.set_status(path, "queued")
+            self.summary_pool.start(task)
+
+        self.btn_cancel.setEnabled(True)
+        self.text_result.setText(f"{len(pending)}개 파일을 큐에 넣었습니다. ⏳")
+
+    def cancel_all(self):
+        # 풀은 폴더 감시 탭과 공유하므로 clear() 하지 않고 취소 플래그만 세움
+        # (대기 중인 작업은 run() 시작 시 바로 끝나고, 실행 중인 작업은 generate 가 멈춤)
+        for path, task in list(self.tasks.items()):
+            task.cancel()
+            if self.items[path].text().startswith(STATUS_ICONS["queued"]):
+                self.on_cancelled(path)
+        self.text_result.setText("취소 요청됨...")
+
+    # --------------------------------
+    # Worker signals (GUI 스레드에서 실행됨)
+    # --------------------------------
+    def on_started(self, path: str):
+        self.set_status(path, "running")
+        self.progress.setValue(0)
+
+    def on_progress(self, path: str, value: int, message: str):
+        self.progress.setValue(value)
+        self.text_result.setText(message)
+
+    def on_finished(self, path: str, summary: str, elapsed: float):
+        self.tasks.pop(path, None)
+        self.summaries[path] = summary
+        self.set_status(path, "done", f"{elapsed:.1f}s")
+        self.file_list.setCurrentItem(self.items[path])
+        self.text_result.setText(summary)
+        self._update_cancel_button()
+
+    def on_failed(self, path: str, error: str):
+        self.tasks.pop(path, None)
+        self.set_status(path, "failed")
+        self._update_cancel_button()
+        QMessageBox.critical(self, "오류", f"{os.path.basename(path)}: {error}")
+
+    def on_cancelled(self, path: str):
+        if self.tasks.pop(path, None) is None:
+            return
+        self.set_status(path, "cancelled")
+        self.progress.setValue(0)
+        self._update_cancel_button()
+
+    def _update_cancel_button(self):
+        self.btn_cancel.setEnabled(bool(self.tasks))
+
+    def show_selected(self, item, _previous=None):
+        if item is None:
             return
+        for path, it in self.items.items():
+            if it is item and path in self.summaries:
+                self.text_result.setText(self.summaries[path])
+                return
+
+
+class MainWindow(QTabWidget):
+    # 탭 1: 파일 선택 요약, 탭 2: 폴더 감시/배치 (요약 풀은 공유)
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("PDF 요약기 (transformers)")
+        self.setGeometry(300, 200, 800, 650)
+
+        self.pdf_tab = PdfSummaryApp()
+        self.watch_tab = FolderWatchPanel(self.pdf_tab.summary_pool)
+        self.addTab(self.pdf_tab, "📝 파일 요약")
+        self.addTab(self.watch_tab, "📁 폴더 감시")
 
-        self.text_result.setText("요약 중입니다... 잠시만 기다려주세요 ⏳")
+    def start_model_loading(self):
+        self.pdf_tab.start_model_loading()
 
-        try:
-            text = extract_text_from_pdf(self.pdf_path)
-            summary_type = "long" if self.radio_long.isChecked() else "short"
-            summary = summarize_text(text, summary_type)
-            self.text_result.setText(summary)
-        except Exception as e:
-            QMessageBox.critical(self, "오류", str(e))
+    def closeEvent(self, event):
+        self.watch_tab.cancel_pending()
+        self.pdf_tab.cancel_all()
+        self.pdf_tab.summary_pool.waitForDone()
+        super().closeEvent(event)
 
 # --------------------------------
 # Main
 # --------------------------------
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = PdfSummaryApp()
+    window = MainWindow()
     window.show()
+    # 창이 먼저 그려진 뒤 모델 로딩 시작
+    QTimer.singleShot(0, window.start_model_loading)
     sys.exit(app.exec_())
@@ -0,0 +1,252 @@
+import os
+import glob
+
+from PyQt5.QtCore import QFileSystemWatcher, QTimer
+from PyQt5.QtWidgets import (
+    QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout, QHBoxLayout,
+    QCheckBox, QRadioButton, QTableWidget, QTableWidgetItem, QHeaderView
+)
+
+from workers import BatchSummaryTask, summary_path_for
+
+# --------------------------------
+# Config
+# --------------------------------
+WATCH_BATCH_SIZE = int(os.environ.get("WATCH_BATCH_SIZE", 4))    # generate 한 번에 묶을 문서 수
+WATCH_SETTLE_MS = int(os.environ.get("WATCH_SETTLE_MS", 1500))   # 복사 중인 파일은 크기가 멈출 때까지 대기
+
+STATUS_TEXT = {
+    "queued": "⏸ 대기",
+    "extracting": "📄 텍스트 추출",
+    "running": "⏳ 요약 중",
+    "done": "✅ 완료",
+    "failed": "❌ 실패",
+    "cancelled": "⏹ 취소",
+}
+COLUMNS = ["파일", "상태", "시간(초)", "요약 파일"]
+
+
+def file_signature(path: str) -> tuple[float, int] | None:
+    # (수정 시각, 크기): 바뀌면 내용이 바뀐 것으로 보고 다시 확인
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+def needs_summary(pdf_path: str) -> bool:
+    # 요약 파일이 없거나 PDF 가 더 새로우면 다시 요약
+    out_path = summary_path_for(pdf_path)
+    return not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(pdf_path)
+
+
+# --------------------------------
+# 폴더 감시 / 배치 모드
+# --------------------------------
+class FolderWatchPanel(QWidget):
+    def __init__(self, summary_pool, parent=None):
+        super().__init__(parent)
+        self.summary_pool = summary_pool   # 단일 파일 요약과 같은 풀 → 모델은 한 번에 하나의 작업만 사용
+
+        self.folder = None
+        self.rows: dict[str, int] = {}          # path -> 테이블 행
+        self.pending: list[str] = []            # 아직 작업으로 만들지 않은 파일
+        self.sizes: dict[str, int] = {}         # 복사 중 여부 확인용 (이전 스캔 때 크기)
+        self.seen: dict[str, tuple] = {}        # path -> 마지막으로 확인한 (mtime, size)
+        self.active: set[str] = set()           # 대기/요약 중인 파일 (끝나기 전에는 다시 넣지 않음)
+        self.tasks: list[BatchSummaryTask] = []
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_scan)
+        self.watcher.fileChanged.connect(self.schedule_scan)   # 이미 본 PDF 가 제자리에서 바뀐 경우
+
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setSingleShot(True)
+        self.scan_timer.timeout.connect(self.scan)
+
+        # Widgets
+        self.label = QLabel("감시할 폴더를 선택하세요")
+        self.btn_folder = QPushButton("📁 폴더 선택")
+        self.btn_watch = QPushButton("▶ 감시 시작")
+        self.btn_watch.setCheckable(True)
+        self.btn_watch.setEnabled(False)
+        self.btn_cancel = QPushButton("⏹ 대기 작업 취소")
+
+        self.check_existing = QCheckBox("폴더에 이미 있는 PDF 도 요약")
+        self.check_existing.setChecked(True)
+        self.radio_short = QRadioButton("짧게 요약")
+        self.radio_long = QRadioButton("자세히 요약")
+        self.radio_short.setChecked(True)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+
+        # Layouts
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(self.btn_folder)
+        top_layout.addWidget(self.btn_watch)
+        top_layout.addWidget(self.btn_cancel)
+
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(self.check_existing)
+        option_layout.addWidget(self.radio_short)
+        option_layout.addWidget(self.radio_long)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.label)
+        layout.addLayout(top_layout)
+        layout.addLayout(option_layout)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+        # Signals
+        self.btn_folder.clicked.connect(self.select_folder)
+        self.btn_watch.toggled.connect(self.toggle_watch)
+        self.btn_cancel.clicked.connect(self.cancel_pending)
+
+    def select_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "감시할 폴더 선택")
+        if not folder:
+            return
+        if self.btn_watch.isChecked():
+            self.btn_watch.setChecked(False)
+        self.folder = folder
+        self.label.setText(f"폴더: {folder}")
+        self.btn_watch.setEnabled(True)
+
+    def toggle_watch(self, on: bool):
+        if on:
+            self.watcher.addPath(self.folder)
+            self.btn_watch.setText("⏸ 감시 중지")
+            self.btn_folder.setEnabled(False)
+            if not self.check_existing.isChecked():
+                # 지금 있는 파일은 건너뛰고 이후 새로 들어오는 파일만
+                for path in self.list_pdfs():
+                    self.seen[path] = file_signature(path)
+            self.schedule_scan()
+        else:
+            if self.watcher.directories():
+                self.watcher.removePaths(self.watcher.directories())
+            self.scan_timer.stop()
+            self.btn_watch.setText("▶ 감시 시작")
+            self.btn_folder.setEnabled(True)
+
+    def list_pdfs(self) -> list[str]:
+        return sorted(glob.glob(os.path.join(self.folder, "*.pdf")))
+
+    def schedule_scan(self, *_):
+        self.scan_timer.start(WATCH_SETTLE_MS)
+
+    def scan(self):
+        if not self.btn_watch.isChecked():
+            return
+
+        unsettled = False
+        for path in self.list_pdfs():
+            if path in self.active:
+                continue
+            sig = file_signature(path)
+            if sig is None or self.seen.get(path) == sig:
+                # 지난번 확인 이후 그대로인 파일
+                continue
+            if not needs_summary(path):
+                self.seen[path] = sig
+                continue
+            size = sig[1]
+            if self.sizes.get(path) != size:
+                # 아직 복사 중일 수 있음 → 다음 스캔에서 크기가 그대로면 큐에 넣음
+                self.sizes[path] = size
+                unsettled = True
+                continue
+            self.sizes.pop(path, None)
+            self.seen[path] = sig
+            self.active.add(path)
+            if path in self.rows:
+                # 바뀐 파일은 같은 행에서 다시 요약
+                self.reset_row(path)
+            else:
+                self.add_row(path)
+                self.watcher.addPath(path)
+            self.pending.append(path)
+
+        self.flush_pending()
+        if unsettled:
+            self.schedule_scan()
+
+    def flush_pending(self):
+        summary_type = "long" if self.radio_long.isChecked() else "short"
+        while self.pending:
+            batch = self.pending[:WATCH_BATCH_SIZE]
+            self.pending = self.pending[WATCH_BATCH_SIZE:]
+
+            task = BatchSummaryTask(batch, summary_type)
+            task.signals.status.connect(self.set_status)
+            task.signals.finished.connect(self.on_finished)
+            task.signals.failed.connect(self.on_failed)
+            task.signals.cancelled.connect(self.on_cancelled)
+            self.tasks.append(task)
+            self.summary_pool.start(task)
+
+    def cancel_pending(self):
+        # 아직 실행 전인 배치는 run() 시작 시 바로 취소됨, 실행 중인 배치는 generate 가 멈춤
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
+        for path in self.pending:
+            self.set_status(path, "cancelled")
+            self.active.discard(path)
+        self.pending.clear()
+
+    # --------------------------------
+    # Table
+    # --------------------------------
+    def add_row(self, path: str):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.rows[path] = row
+        self.table.setItem(row, 0, QTableWidgetItem(os.path.basename(path)))
+        self.table.setItem(row, 2, QTableWidgetItem(""))
+        self.table.setItem(row, 3, QTableWidgetItem(""))
+        self.set_status(path, "queued")
+
+    def reset_row(self, path: str):
+        row = self.rows[path]
+        self.table.setItem(row, 2, QTableWidgetItem(""))
+        self.table.setItem(row, 3, QTableWidgetItem(""))
+        self.set_status(path, "queued")
+
+    def set_status(self, path: str, status: str):
+        row = self.rows.get(path, -1)
+        if row >= 0:
+            self.table.setItem(row, 1, QTableWidgetItem(STATUS_TEXT[status]))
+
+    def on_finished(self, path: str, out_path: str, elapsed: float):
+        self.set_status(path, "done")
+        row = self.rows[path]
+        self.table.setItem(row, 2, QTableWidgetItem(f"{elapsed:.1f}"))
+        self.table.setItem(row, 3, QTableWidgetItem(os.path.basename(out_path)))
+        self._forget_finished_tasks(path)
+
+    def on_failed(self, path: str, error: str):
+        self.set_status(path, "failed")
+        item = self.table.item(self.rows[path], 1)
+        item.setToolTip(error)
+        self._forget_finished_tasks(path)
+
+    def on_cancelled(self, path: str):
+        self.set_status(path, "cancelled")
+        self._forget_finished_tasks(path)
+
+    def _forget_finished_tasks(self, path: str):
+        # 요약하는 동안 파일이 또 바뀌었을 수 있으니 한 번 더 스캔
+        self.active.discard(path)
+        self.schedule_scan()
+        done = {
+            p for p, row in self.rows.items()
+            if row >= 0 and self.table.item(row, 1).text() in (
+                STATUS_TEXT["done"], STATUS_TEXT["failed"], STATUS_TEXT["cancelled"])
+        }
+        self.tasks = [t for t in self.tasks if not set(t.pdf_paths) <= done]
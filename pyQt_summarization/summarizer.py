@@ -0,0 +1,142 @@
+import threading
+
+import torch
+from pypdf import PdfReader
+from transformers import StoppingCriteria, StoppingCriteriaList
+
+from assisted_decoding import ASSIST_MODE, ASSIST_SUMMARY_TYPES, assisted_params, load_assistant
+from inference_backend import DEFAULT_BACKEND, load_seq2seq, pick_device
+
+# --------------------------------
+# Config
+# --------------------------------
+MODEL_NAME = "lcw99/t5-base-korean-text-summary"
+
+# 추론 백엔드: eager / int8 / compile / onnx (환경변수 SUMMARY_BACKEND)
+BACKEND = DEFAULT_BACKEND
+device = pick_device(BACKEND)
+
+# 요약 길이 옵션 (generate 파라미터)
+SUMMARY_PARAMS = {
+    "short": {"max_length": 200, "min_length": 60, "num_beams": 2},
+    "long": {"max_length": 400, "min_length": 150, "num_beams": 4},
+}
+
+# --------------------------------
+# Load model (처음 필요할 때 1회, 백그라운드 스레드에서)
+# --------------------------------
+_model_lock = threading.Lock()
+_tokenizer = None
+_model = None
+_assist_kwargs = None   # assisted generation 인자 (SUMMARY_ASSIST 가 off 면 {})
+
+
+def get_model():
+    global _tokenizer, _model, _assist_kwargs
+    with _model_lock:
+        if _model is None:
+            _tokenizer, _model = load_seq2seq(MODEL_NAME, BACKEND, device)
+            _assist_kwargs = load_assistant(_tokenizer, _model, device=device)
+    return _tokenizer, _model
+
+
+def is_model_loaded() -> bool:
+    return _model is not None
+
+# --------------------------------
+# PDF → Text
+# --------------------------------
+def extract_text_from_pdf(pdf_path: str) -> str:
+    reader = PdfReader(pdf_path)
+    texts = []
+    for page in reader.pages:
+        t = page.extract_text()
+        if t:
+            texts.append(t.strip())
+    return "\n".join(texts)
+
+# --------------------------------
+# Summarization
+# --------------------------------
+def use_assistant(summary_type: str) -> bool:
+    return ASSIST_MODE != "off" and summary_type in ASSIST_SUMMARY_TYPES
+
+
+def generate_params(summary_type: str) -> dict:
+    params = SUMMARY_PARAMS.get(summary_type, SUMMARY_PARAMS["short"])
+    if use_assistant(summary_type) and _assist_kwargs:
+        # beam search 대신 draft 모델이 제안한 토큰을 검증하는 greedy
+        return assisted_params(params, _assist_kwargs)
+    return params
+
+
+class StopRequested(StoppingCriteria):
+    # 취소 버튼을 누르면 generate 가 다음 토큰에서 멈추도록
+    def __init__(self, should_stop):
+        self.should_stop = should_stop
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return bool(self.should_stop())
+
+
+def summarize_text(text: str, summary_type: str, should_stop=None) -> str:
+    if not text.strip():
+        return "요약할 텍스트가 없습니다."
+
+    tokenizer, model = get_model()
+    params = generate_params(summary_type)
+
+    inputs = tokenizer(
+        text[:3000],
+        return_tensors="pt",
+        truncation=True
+    ).to(device)
+
+    stopping = StoppingCriteriaList([StopRequested(should_stop)]) if should_stop else None
+    with torch.no_grad():
+        output_ids = model.generate(
+            **inputs,
+            **params,
+            early_stopping=True,
+            stopping_criteria=stopping
+        )
+
+    return tokenizer.decode(output_ids[0], skip_special_tokens=True)
+
+
+def summarize_batch(texts: list[str], summary_type: str, should_stop=None) -> list[str]:
+    # 여러 문서를 패딩해서 generate 한 번에 요약 (빈 문서는 모델에 넣지 않음)
+    results = ["요약할 텍스트가 없습니다."] * len(texts)
+    idx = [i for i, t in enumerate(texts) if t.strip()]
+    if not idx:
+        return results
+
+    tokenizer, model = get_model()
+    if use_assistant(summary_type) and _assist_kwargs:
+        # assisted generation 은 batch 1 만 지원 → 문서별로
+        for i in idx:
+            results[i] = summarize_text(texts[i], summary_type, should_stop)
+        return results
+
+    params = SUMMARY_PARAMS.get(summary_type, SUMMARY_PARAMS["short"])
+
+    inputs = tokenizer(
+        [texts[i][:3000] for i in idx],
+        return_tensors="pt",
+        padding=True,
+        truncation=True
+    ).to(device)
+
+    stopping = StoppingCriteriaList([StopRequested(should_stop)]) if should_stop else None
+    with torch.no_grad():
+        output_ids = model.generate(
+            **inputs,
+            **params,
+            early_stopping=True,
+            stopping_criteria=stopping
+        )
+
+    decoded = tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+    for i, summary in zip(idx, decoded):
+        results[i] = summary
+    return results
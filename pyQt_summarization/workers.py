@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from summarizer import extract_text_from_pdf, get_model, summarize_batch, summarize_text
+
+
+# =====================================================
+# 백그라운드 작업 (QThreadPool 에서 실행)
+# -----------------------------------------------------
+# GUI 스레드는 화면만 그리고, 모델 로딩/PDF 추출/요약은 모두 여기서 한다.
+# 결과는 시그널로 GUI 스레드에 전달된다 (Qt 가 알아서 GUI 스레드로 넘겨줌).
+# =====================================================
+class ModelLoadSignals(QObject):
+    loaded = pyqtSignal()
+    failed = pyqtSignal(str)
+
+
+class ModelLoadTask(QRunnable):
+    # 창이 뜬 뒤 백그라운드에서 from_pretrained
+    def __init__(self):
+        super().__init__()
+        self.signals = ModelLoadSignals()
+
+    def run(self):
+        try:
+            get_model()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.loaded.emit()
+
+
+class SummarySignals(QObject):
+    started = pyqtSignal(str)                 # path
+    progress = pyqtSignal(str, int, str)      # path, 0~100, 메시지
+    finished = pyqtSignal(str, str, float)    # path, 요약, 걸린 시간(초)
+    failed = pyqtSignal(str, str)             # path, 오류
+    cancelled = pyqtSignal(str)               # path
+
+
+class SummaryTask(QRunnable):
+    def __init__(self, pdf_path: str, summary_type: str):
+        super().__init__()
+        self.pdf_path = pdf_path
+        self.summary_type = summary_type
+        self.signals = SummarySignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self):
+        path = self.pdf_path
+        if self.is_cancelled():
+            self.signals.cancelled.emit(path)
+            return
+
+        start = time.perf_counter()
+        self.signals.started.emit(path)
+        try:
+            self.signals.progress.emit(path, 10, f"{os.path.basename(path)}: 텍스트 추출 중...")
+            text = extract_text_from_pdf(path)
+            if self.is_cancelled():
+                self.signals.cancelled.emit(path)
+                return
+
+            self.signals.progress.emit(path, 30, f"{os.path.basename(path)}: 모델 준비 중...")
+            get_model()  # 아직 로딩 중이면 여기서 기다림
+            if self.is_cancelled():
+                self.signals.cancelled.emit(path)
+                return
+
+            self.signals.progress.emit(path, 50, f"{os.path.basename(path)}: 요약 중입니다... ⏳")
+            summary = summarize_text(text, self.summary_type, should_stop=self.is_cancelled)
+            if self.is_cancelled():
+                self.signals.cancelled.emit(path)
+                return
+        except Exception as e:
+            self.signals.failed.emit(path, str(e))
+            return
+
+        self.signals.progress.emit(path, 100, f"{os.path.basename(path)}: 완료")
+        self.signals.finished.emit(path, summary, time.perf_counter() - start)
+
+
+def summary_path_for(pdf_path: str) -> str:
+    # report.pdf → report.summary.txt (원본 옆에 저장)
+    return os.path.splitext(pdf_path)[0] + ".summary.txt"
+
+
+class BatchSummarySignals(QObject):
+    status = pyqtSignal(str, str)             # path, 상태
+    finished = pyqtSignal(str, str, float)    # path, 저장한 요약 파일, 걸린 시간(초)
+    failed = pyqtSignal(str, str)             # path, 오류
+    cancelled = pyqtSignal(str)               # path
+
+
+class BatchSummaryTask(QRunnable):
+    # 폴더 감시 모드: 여러 PDF 를 읽어서 generate 한 번으로 묶어 요약하고, 결과는 파일로 저장
+    def __init__(self, pdf_paths: list[str], summary_type: str):
+        super().__init__()
+        self.pdf_paths = list(pdf_paths)
+        self.summary_type = summary_type
+        self.signals = BatchSummarySignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _cancel_all(self, paths):
+        for path in paths:
+            self.signals.cancelled.emit(path)
+
+    def run(self):
+        if self.is_cancelled():
+            self._cancel_all(self.pdf_paths)
+            return
+
+        start = time.perf_counter()
+        paths, texts, failed = [], [], set()
+        for path in self.pdf_paths:
+            if self.is_cancelled():
+                # 이미 실패로 표시한 파일만 빼고 (추출이 끝난 파일 포함) 모두 취소로
+                self._cancel_all(p for p in self.pdf_paths if p not in failed)
+                return
+            self.signals.status.emit(path, "extracting")
+            try:
+                texts.append(extract_text_from_pdf(path))
+                paths.append(path)
+            except Exception as e:
+                failed.add(path)
+                self.signals.failed.emit(path, str(e))
+
+        if not paths:
+            return
+
+        for path in paths:
+            self.signals.status.emit(path, "running")
+        try:
+            summaries = summarize_batch(texts, self.summary_type, should_stop=self.is_cancelled)
+        except Exception as e:
+            for path in paths:
+                self.signals.failed.emit(path, str(e))
+            return
+        if self.is_cancelled():
+            self._cancel_all(paths)
+            return
+
+        # 배치 전체 시간을 문서 수로 나눠 문서당 시간으로 보여줌
+        per_doc = (time.perf_counter() - start) / len(paths)
+        for path, summary in zip(paths, summaries):
+            out_path = summary_path_for(path)
+            try:
+                with open(out_path, "w", encoding="utf-8") as f:
+                    f.write(summary + "\n")
+            except OSError as e:
+                self.signals.failed.emit(path, str(e))
+                continue
+            self.signals.finished.emit(path, out_path, per_doc)